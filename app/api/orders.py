@@ -1,29 +1,87 @@
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from app.db.session import get_db
-from app.db.models.order import Order
+from app.db.models.order import Order, OrderStatus, PRIORITY_RANK
 from app.db.models.order_item import OrderItem
 from app.db.models.vendor import Vendor
+from app.db.models.order_snapshot import OrderSnapshot
+from app.db.order_snapshots import build_snapshot, serve_orders, snapshot_response
+from app.db.group_commit import order_writer
 from app.schemas.order import OrderCreate, OrderResponse, OrderPriority, OrderSummaryResponse, PaginatedOrderResponse
+from app.schemas.vendor import VendorResponse
 from app.background.order_processing import process_order_background, process_high_priority_order
+from app.background.cancellation import cancellations
+from app.background.status_writer import status_writer
 from app.utils.rate_limiter import vendor_rate_limit
+from app.utils.admission import admission
 from typing import List, Optional, Union
 from datetime import datetime, date, time
 from fastapi import Query
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlalchemy import paginate
+from app import config
 import logging
+from time import perf_counter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+def _build_order(order: OrderCreate) -> Order:
+    new_order = Order(
+        order_id=order.order_id,
+        vendor_id=order.vendor_id,
+        priority=order.priority,
+        address=order.address,
+        city=order.city,
+        state=order.state,
+        postal_code=order.postal_code
+    )
+
+    for item in order.items:
+        new_item = OrderItem(
+            item_name=item.item_name,
+            quantity=item.quantity
+        )
+        new_order.items.append(new_item)
+
+    return new_order
+
+def _insert_grouped(order: OrderCreate, vendor_data: VendorResponse) -> dict:
+    # Runs on the group commit writer; the response is built from the flushed
+    # order instead of a db.refresh() round trip
+    def build(session: Session):
+        new_order = _build_order(order)
+        session.add(new_order)
+
+        def finish():
+            snapshot = build_snapshot(new_order, vendor_data)
+            if config.ORDER_READ_MODEL_ENABLED:
+                session.add(snapshot)
+            return snapshot_response(snapshot.payload, new_order.status)
+
+        return finish
+
+    try:
+        return order_writer.submit(build)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Duplicate order for this vendor")
+    except TimeoutError:
+        # The order was withdrawn before it was written, so a retry can succeed
+        raise HTTPException(
+            status_code=503,
+            detail="Order write timed out, retry later",
+            headers={"Retry-After": str(config.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+
 @router.post("/", response_model=OrderResponse)
 @vendor_rate_limit("5/minute")
 def create_order(order: OrderCreate, background_tasks: BackgroundTasks, request: Request, db: Session = Depends(get_db)):
-    
+    admission.admit(order.priority)
+
     vendor = db.query(Vendor).filter(Vendor.id == order.vendor_id).first()
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
@@ -36,38 +94,41 @@ def create_order(order: OrderCreate, background_tasks: BackgroundTasks, request:
     if existing_order:
         raise HTTPException(status_code=409, detail="Duplicate order for this vendor")
 
-    new_order = Order(
-        order_id=order.order_id,
-        vendor_id=order.vendor_id,
-        priority=order.priority,
-        address=order.address,
-        city=order.city,
-        state=order.state,
-        postal_code=order.postal_code
-    )
-
     for item in order.items:
         if item.quantity <= 0:
             raise HTTPException(status_code=400, detail=f"Quantity must be >0 for item {item.item_name}")
 
-        new_item = OrderItem(
-            item_name=item.item_name,
-            quantity=item.quantity
-        )
-        new_order.items.append(new_item)
-
-    db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    if config.ORDER_GROUP_COMMIT_ENABLED:
+        vendor_data = VendorResponse.model_validate(vendor)
+        # Hand the pooled connection back while this thread waits on the writer
+        db.close()
+        write_started = perf_counter()
+        try:
+            created = _insert_grouped(order, vendor_data)
+        finally:
+            # Timed-out and failed writes are the slowest; they must reach the signal too
+            admission.record_write_latency(perf_counter() - write_started)
+        order_pk = created["id"]
+    else:
+        new_order = _build_order(order)
+        db.add(new_order)
+        if config.ORDER_READ_MODEL_ENABLED:
+            db.flush()
+            db.add(build_snapshot(new_order, vendor))
+        write_started = perf_counter()
+        db.commit()
+        admission.record_write_latency(perf_counter() - write_started)
+        db.refresh(new_order)
+        created, order_pk = new_order, new_order.id
 
     if order.priority == OrderPriority.HIGH:
-        background_tasks.add_task(process_high_priority_order, new_order.id)
-        logger.info(f"Queued HIGH PRIORITY order {new_order.order_id} (ID: {new_order.id}) for processing")
+        background_tasks.add_task(admission.track(process_high_priority_order), order_pk, order.vendor_id)
+        logger.info(f"Queued HIGH PRIORITY order {order.order_id} (ID: {order_pk}) for processing")
     else:
-        background_tasks.add_task(process_order_background, new_order.id)
-        logger.info(f"📋 Queued order {new_order.order_id} (ID: {new_order.id}) for background processing")
+        background_tasks.add_task(admission.track(process_order_background), order_pk, order.vendor_id)
+        logger.info(f"📋 Queued order {order.order_id} (ID: {order_pk}) for background processing")
 
-    return new_order
+    return created
 
 @router.get("/{vendor_id}", response_model=Union[List[OrderResponse], PaginatedOrderResponse])
 def get_orders(vendor_id: int, start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"), end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"), priority: Optional[OrderPriority] = Query(None),
@@ -75,7 +136,12 @@ def get_orders(vendor_id: int, start_date: Optional[date] = Query(None, descript
     size: int = Query(50, ge=1, le=100, description="Page size"), 
     db: Session = Depends(get_db)
 ):
-    query = db.query(Order).filter(Order.vendor_id == vendor_id)
+    if config.ORDER_READ_MODEL_ENABLED:
+        query = db.query(Order.id, Order.status, OrderSnapshot.payload).outerjoin(
+            OrderSnapshot, OrderSnapshot.id == Order.id
+        ).filter(Order.vendor_id == vendor_id)
+    else:
+        query = db.query(Order).filter(Order.vendor_id == vendor_id)
 
     if start_date:
         start_datetime = datetime.combine(start_date, time.min)
@@ -92,21 +158,18 @@ def get_orders(vendor_id: int, start_date: Optional[date] = Query(None, descript
     if total_count == 0:
         raise HTTPException(status_code=404, detail="No orders found for this vendor")
 
-    query = query.order_by(
-        case(
-            (Order.priority == OrderPriority.HIGH, 1),
-            (Order.priority == OrderPriority.MEDIUM, 2),
-            (Order.priority == OrderPriority.LOW, 3),
-            else_=4
-        ),
-        Order.created_at
-    )
+    # Served in index order by ix_vendor_priority_rank, no sort
+    query = query.order_by(PRIORITY_RANK, Order.created_at)
 
     if total_count > 50:
         params = Params(page=page, size=size)
+        if config.ORDER_READ_MODEL_ENABLED:
+            return paginate(query, params, transformer=lambda rows: serve_orders(db, vendor_id, rows))
         paginated_result = paginate(query, params)
         return paginated_result
     else:
+        if config.ORDER_READ_MODEL_ENABLED:
+            return serve_orders(db, vendor_id, query.all())
         orders = query.all()
         return orders
 
@@ -124,6 +187,52 @@ def get_order_status(order_id: str, db: Session = Depends(get_db)):
         "updated_at": order.updated_at
     }
 
+@router.post("/{order_id}/cancel")
+def cancel_order(order_id: str, vendor_id: Optional[int] = Query(None, description="Vendor the order number belongs to"), db: Session = Depends(get_db)):
+
+    query = db.query(Order).filter(Order.order_id == order_id)
+    if vendor_id is not None:
+        query = query.filter(Order.vendor_id == vendor_id)
+    matches = query.limit(2).all()
+
+    if not matches:
+        raise HTTPException(status_code=404, detail="Order not found")
+    # Order numbers are only unique per vendor; never guess which one to cancel
+    if len(matches) > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Order {order_id} exists for several vendors, pass vendor_id"
+        )
+    order = matches[0]
+
+    # A processor that has finished may not have had its outcome written yet;
+    # cancelling now would only hide work that was already done
+    finished = status_writer.pending_status(order.id, order.vendor_id)
+    if finished in (OrderStatus.PROCESSED, OrderStatus.FAILED):
+        raise HTTPException(status_code=409, detail=f"Order cannot be cancelled in status {finished.value}")
+
+    # Compare-and-set so a processor finishing at the same moment cannot be overwritten
+    cancelled = db.query(Order).filter(
+        Order.id == order.id,
+        Order.vendor_id == order.vendor_id,
+        Order.status.in_([OrderStatus.PENDING, OrderStatus.PROCESSING])
+    ).update({Order.status: OrderStatus.CANCELLED}, synchronize_session=False)
+    db.commit()
+
+    if not cancelled:
+        db.refresh(order)
+        raise HTTPException(status_code=409, detail=f"Order cannot be cancelled in status {order.status.value}")
+
+    cancellations.cancel(order.id, order.vendor_id)
+    db.refresh(order)
+    logger.info(f"Cancelled order {order.order_id} (ID: {order.id})")
+
+    return {
+        "order_id": order.order_id,
+        "status": order.status,
+        "updated_at": order.updated_at
+    }
+
 @router.get("/summary/{vendor_id}", response_model=OrderSummaryResponse)
 def get_order_summary(vendor_id: int, db: Session = Depends(get_db)):
    
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, engine, shard_router
+from app.db.shards import allocate_vendor_id, release_vendor_id
 from app.db.models.vendor import Vendor
 from app.schemas.vendor import VendorCreate, VendorResponse
 from typing import List
@@ -25,9 +27,26 @@ def create_vendor(vendor: VendorCreate, db: Session = Depends(get_db)):
         name=vendor.name,
         email=vendor.email
     )
+
+    if shard_router is not None:
+        # The id decides the shard, so it has to be known before the insert
+        try:
+            new_vendor.id = allocate_vendor_id(engine, vendor.name)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Vendor with name '{vendor.name}' already exists"
+            )
     
     db.add(new_vendor)
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        if shard_router is not None:
+            # Otherwise the name stays taken by a vendor that does not exist
+            release_vendor_id(engine, new_vendor.id)
+        raise
     db.refresh(new_vendor)
     
     logger.info(f"Created new vendor: {new_vendor.name} (ID: {new_vendor.id})")
@@ -36,8 +55,9 @@ def create_vendor(vendor: VendorCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[VendorResponse])
 def get_vendors(db: Session = Depends(get_db)):
+    # Scattered to every shard when sharding is enabled
     vendors = db.query(Vendor).all()
-    return vendors
+    return sorted(vendors, key=lambda v: v.id)
 
 @router.get("/{vendor_id}", response_model=VendorResponse)
 def get_vendor(vendor_id: int, db: Session = Depends(get_db)):
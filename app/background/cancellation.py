@@ -0,0 +1,47 @@
+# app/background/cancellation.py
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class CancellationRegistry:
+    """
+    Cancel flags for the processors running in this process. A processor
+    registers with start() before it loads its order and leaves with finish(),
+    and checks is_cancelled() at every step boundary, so cancelled work stops
+    taking processing capacity. cancel() only flags orders with a running
+    processor, so the registry never outgrows the processors in flight; an
+    order cancelled before its processor starts is dropped when the processor
+    reads the CANCELLED status. Processors in other processes are covered by
+    the status writer guard alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Dict[Tuple[Optional[int], int], bool] = {}
+
+    def start(self, order_id: int, vendor_id: Optional[int]) -> None:
+        with self._lock:
+            self._running[(vendor_id, order_id)] = False
+
+    def finish(self, order_id: int, vendor_id: Optional[int]) -> None:
+        with self._lock:
+            self._running.pop((vendor_id, order_id), None)
+
+    def cancel(self, order_id: int, vendor_id: Optional[int]) -> bool:
+        """Flag a running processor; returns False when none is running here."""
+        with self._lock:
+            if (vendor_id, order_id) not in self._running:
+                return False
+            self._running[(vendor_id, order_id)] = True
+            return True
+
+    def is_cancelled(self, order_id: int, vendor_id: Optional[int]) -> bool:
+        with self._lock:
+            return self._running.get((vendor_id, order_id), False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+
+cancellations = CancellationRegistry()
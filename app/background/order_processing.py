@@ -1,97 +1,120 @@
 import asyncio
 import logging
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.db.models.order import Order, OrderStatus
+from app.background.status_writer import status_writer
+from app.background.cancellation import cancellations
 
 logger = logging.getLogger(__name__)
 
-async def process_order_background(order_id: int):
-    logger.info(f"Starting background processing for order ID: {order_id}")
-    
+def _get_order(db: Session, order_id: int, vendor_id: Optional[int]):
+    # Order ids are only unique per shard; the vendor id routes the lookup
+    query = db.query(Order).filter(Order.id == order_id)
+    if vendor_id is not None:
+        query = query.filter(Order.vendor_id == vendor_id)
+    return query.first()
+
+def _load_order_state(order_id: int, vendor_id: Optional[int]) -> Optional[Tuple[str, OrderStatus]]:
+    # Only the order number (for logging) and status are needed; the session is
+    # closed before any processing step so no connection is held across the sleeps
     db = SessionLocal()
-    
     try:
-        order = db.query(Order).filter(Order.id == order_id).first()
-        if not order:
+        order = _get_order(db, order_id, vendor_id)
+        return (order.order_id, order.status) if order else None
+    finally:
+        db.close()
+
+async def process_order_background(order_id: int, vendor_id: Optional[int] = None):
+    logger.info(f"Starting background processing for order ID: {order_id}")
+
+    # Registered before the order is read, so a cancel that the read misses
+    # still reaches this processor through the registry
+    cancellations.start(order_id, vendor_id)
+    try:
+        state = _load_order_state(order_id, vendor_id)
+        if not state:
             logger.error(f"Order {order_id} not found")
             return
-        
-        order.status = OrderStatus.PROCESSING
-        db.commit()
-        logger.info(f"Processing order {order.order_id} - Status: {order.status.value}")
-        
+        order_number, status = state
+        if status == OrderStatus.CANCELLED:
+            logger.info(f"Order {order_number} was cancelled before processing started, dropping it")
+            return
+
+        status_writer.record(order_id, vendor_id, OrderStatus.PROCESSING)
+        logger.info(f"Processing order {order_number} - Status: {OrderStatus.PROCESSING.value}")
+
         processing_steps = [
             "Validating order details and customer information",
-            "Checking inventory availability for all items", 
+            "Checking inventory availability for all items",
             "Calculating shipping costs and delivery time",
             "Processing payment authorization",
             "Sending order confirmation email to customer",
             "Updating order status to processed"
         ]
-        
+
         for i, step in enumerate(processing_steps, 1):
+            if cancellations.is_cancelled(order_id, vendor_id):
+                logger.info(f"Order {order_number} cancelled, stopping before step {i}")
+                return
             logger.info(f"Step {i}/{len(processing_steps)}: {step}")
             await asyncio.sleep(2)
             logger.info(f"Completed step {i}: {step}")
-        
-        order.status = OrderStatus.PROCESSED
-        db.commit()
-        logger.info(f"Order {order.order_id} - Status: {order.status.value}")
-        
+
+        status_writer.record(order_id, vendor_id, OrderStatus.PROCESSED)
+        logger.info(f"Order {order_number} - Status: {OrderStatus.PROCESSED.value}")
+
     except Exception as e:
         logger.error(f"Error processing order {order_id}: {e}")
-        
-        try:
-            order = db.query(Order).filter(Order.id == order_id).first()
-            if order:
-                order.status = OrderStatus.FAILED
-                db.commit()
-                logger.info(f"Order {order.order_id} - Status: {order.status.value}")
-        except Exception as db_error:
-            logger.error(f"Failed to update order status: {db_error}")
-    
+        status_writer.record(order_id, vendor_id, OrderStatus.FAILED)
+        logger.info(f"Order {order_id} - Status: {OrderStatus.FAILED.value}")
+
     finally:
-        db.close()
+        cancellations.finish(order_id, vendor_id)
         logger.info(f"Completed background processing for order ID: {order_id}")
 
-async def process_high_priority_order(order_id: int):
+async def process_high_priority_order(order_id: int, vendor_id: Optional[int] = None):
     logger.info(f"Processing HIGH PRIORITY order ID: {order_id}")
-    
-    db = SessionLocal()
-    
+
+    # Registered before the order is read, so a cancel that the read misses
+    # still reaches this processor through the registry
+    cancellations.start(order_id, vendor_id)
     try:
-        order = db.query(Order).filter(Order.id == order_id).first()
-        if not order:
+        state = _load_order_state(order_id, vendor_id)
+        if not state:
             logger.error(f"High priority order {order_id} not found")
             return
-        
-        order.status = OrderStatus.PROCESSING
-        db.commit()
-        logger.info(f"Processing HIGH PRIORITY order {order.order_id} - Status: {order.status.value}")
-        
+        order_number, status = state
+        if status == OrderStatus.CANCELLED:
+            logger.info(f"HIGH PRIORITY order {order_number} was cancelled before processing started, dropping it")
+            return
+
+        status_writer.record(order_id, vendor_id, OrderStatus.PROCESSING)
+        logger.info(f"Processing HIGH PRIORITY order {order_number} - Status: {OrderStatus.PROCESSING.value}")
+
         priority_steps = [
             "Expedited order validation",
             "Priority inventory allocation",
-            "Express shipping calculation", 
+            "Express shipping calculation",
             "Immediate payment processing",
             "Priority shipping label generation",
             "Urgent customer notification",
             "Status update to processed"
         ]
-        
+
         for i, step in enumerate(priority_steps, 1):
+            if cancellations.is_cancelled(order_id, vendor_id):
+                logger.info(f"HIGH PRIORITY order {order_number} cancelled, stopping before step {i}")
+                return
             logger.info(f"PRIORITY Step {i}: {step}")
             await asyncio.sleep(1)
-        
-        order.status = OrderStatus.PROCESSED
-        db.commit()
-        logger.info(f"HIGH PRIORITY order {order.order_id} - Status: {order.status.value}")
-        
+
+        status_writer.record(order_id, vendor_id, OrderStatus.PROCESSED)
+        logger.info(f"HIGH PRIORITY order {order_number} - Status: {OrderStatus.PROCESSED.value}")
+
     except Exception as e:
         logger.error(f"Error processing high priority order {order_id}: {e}")
-        if order:
-            order.status = OrderStatus.FAILED
-            db.commit()
+        status_writer.record(order_id, vendor_id, OrderStatus.FAILED)
     finally:
-        db.close()
+        cancellations.finish(order_id, vendor_id)
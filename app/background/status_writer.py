@@ -0,0 +1,137 @@
+# app/background/status_writer.py
+"""
+Batched status writer for the background processors.
+
+Processors call ``record()`` instead of committing their own UPDATE. Pending
+transitions are kept per order (only the latest one matters, since an order
+only ever moves forward) and written every STATUS_FLUSH_INTERVAL_MS as one
+``UPDATE orders SET status = ... WHERE id IN (...)`` per target status (and
+per shard), all in one transaction per database.
+
+Flushes never overlap, so an order's transitions reach the database in the
+order they were recorded. Each UPDATE is also guarded by the statuses it may
+move from, so a late transition never overwrites a terminal one.
+``pending_status()`` exposes a transition until it is committed, so callers
+that act on the stored status (e.g. cancel) can see it is already outdated.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import update
+from app import config
+from app.db.models.order import Order, OrderStatus
+from app.db.session import SessionLocal, shard_router
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FROM = {
+    OrderStatus.PROCESSING: (OrderStatus.PENDING,),
+    OrderStatus.PROCESSED: (OrderStatus.PENDING, OrderStatus.PROCESSING),
+    OrderStatus.FAILED: (OrderStatus.PENDING, OrderStatus.PROCESSING),
+}
+
+
+class StatusWriter:
+    def __init__(self, interval_ms: float, max_pending: int):
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[Optional[int], int], OrderStatus] = {}
+        self._writing: Dict[Tuple[Optional[int], int], OrderStatus] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self.flushes = 0
+        self.transitions = 0
+
+    def record(self, order_id: int, vendor_id: Optional[int], status: OrderStatus) -> None:
+        """Queue a transition; must be called from the event loop."""
+        self._ensure_started()
+        self._pending[(vendor_id, order_id)] = status
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def pending_status(self, order_id: int, vendor_id: Optional[int]) -> Optional[OrderStatus]:
+        """
+        Latest transition recorded for the order but not committed yet. Safe
+        to call from any thread: a flush publishes its batch in ``_writing``
+        before it empties ``_pending`` and clears it only after the commit.
+        """
+        key = (vendor_id, order_id)
+        return self._pending.get(key) or self._writing.get(key)
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = self._writing = self._pending
+            self._pending = {}
+            try:
+                await asyncio.to_thread(self._apply, batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} status transitions: {e}")
+                # Put them back unless a newer transition arrived meanwhile
+                for key, status in batch.items():
+                    self._pending.setdefault(key, status)
+                return
+            finally:
+                self._writing = {}
+            self.flushes += 1
+            self.transitions += len(batch)
+
+    def _apply(self, batch: Dict[Tuple[Optional[int], int], OrderStatus]) -> None:
+        groups = defaultdict(list)
+        for (vendor_id, order_id), status in batch.items():
+            shard_id = shard_router.shard_for(vendor_id) if shard_router and vendor_id is not None else None
+            groups[(shard_id, status)].append(order_id)
+
+        db = SessionLocal()
+        try:
+            for (shard_id, status), order_ids in groups.items():
+                stmt = (
+                    update(Order)
+                    .where(Order.id.in_(order_ids), Order.status.in_(ALLOWED_FROM[status]))
+                    .values(status=status)
+                    .execution_options(synchronize_session=False)
+                )
+                db.execute(stmt, bind_arguments={"shard_id": shard_id} if shard_id is not None else None)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """Flush-on-shutdown hook: write everything still pending, then stop the flusher."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+
+status_writer = StatusWriter(
+    interval_ms=config.STATUS_FLUSH_INTERVAL_MS,
+    max_pending=config.STATUS_FLUSH_MAX_PENDING,
+)
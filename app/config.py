@@ -0,0 +1,40 @@
+# app/config.py
+import os
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Serve order reads from the denormalized order_snapshots table
+ORDER_READ_MODEL_ENABLED = _env_bool("ORDER_READ_MODEL_ENABLED", False)
+
+# Admission control for create_order: LOW/MEDIUM orders are shed with 503 once
+# the background backlog or the smoothed DB write latency crosses these marks
+ADMISSION_CONTROL_ENABLED = _env_bool("ADMISSION_CONTROL_ENABLED", True)
+ADMISSION_MAX_BACKLOG = int(os.getenv("ADMISSION_MAX_BACKLOG", "500"))
+ADMISSION_MAX_WRITE_LATENCY_MS = float(os.getenv("ADMISSION_MAX_WRITE_LATENCY_MS", "250"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+# A write latency reading older than this is dropped, since shedding stops new samples
+ADMISSION_LATENCY_STALE_SECONDS = float(os.getenv("ADMISSION_LATENCY_STALE_SECONDS", "5"))
+
+# Per-vendor SQLite sharding. 0 keeps the single app.db; N > 0 maps
+# vendor_id % N onto N database files built from the URL template
+DB_SHARD_COUNT = int(os.getenv("DB_SHARD_COUNT", "0"))
+DB_SHARD_URL_TEMPLATE = os.getenv("DB_SHARD_URL_TEMPLATE", "sqlite:///./app_shard_{shard}.db")
+
+# Group commit for create_order: inserts from concurrent requests are gathered
+# for up to LINGER_MS (or MAX_BATCH orders) and committed in one transaction
+ORDER_GROUP_COMMIT_ENABLED = _env_bool("ORDER_GROUP_COMMIT_ENABLED", False)
+ORDER_GROUP_COMMIT_MAX_BATCH = int(os.getenv("ORDER_GROUP_COMMIT_MAX_BATCH", "64"))
+ORDER_GROUP_COMMIT_LINGER_MS = float(os.getenv("ORDER_GROUP_COMMIT_LINGER_MS", "5"))
+# How long a request waits for its batch before giving up with 503
+ORDER_GROUP_COMMIT_TIMEOUT_SECONDS = float(os.getenv("ORDER_GROUP_COMMIT_TIMEOUT_SECONDS", "30"))
+
+# Background status transitions are coalesced and written as one
+# UPDATE ... WHERE id IN (...) per target status every interval
+STATUS_FLUSH_INTERVAL_MS = float(os.getenv("STATUS_FLUSH_INTERVAL_MS", "100"))
+STATUS_FLUSH_MAX_PENDING = int(os.getenv("STATUS_FLUSH_MAX_PENDING", "1000"))
@@ -0,0 +1,165 @@
+# app/db/group_commit.py
+"""
+Group commit: concurrent request threads hand their inserts to one writer
+thread, which applies everything that arrives within a short linger window
+(or up to a maximum batch size) in a single transaction and a single fsync.
+
+A job is a callable ``build(db)`` that adds its objects to the writer's
+session and returns ``finish()``. ``finish`` runs after the batch is flushed,
+when primary keys are assigned, and its return value is handed back to the
+waiting request. The request only gets its result after the commit, so an
+acknowledged order is as durable as with a per-request commit.
+
+If the batch fails (e.g. one order violates ``uq_order_vendor``), it is rolled
+back and every job is retried in its own transaction so each caller receives
+its own result or error. Anything else that goes wrong while writing a batch
+fails all of its jobs, and jobs still queued when the writer stops are failed
+too, so no request thread waits on a future nobody will resolve. A caller
+that has waited ``timeout`` seconds withdraws its job if the writer has not
+picked it up yet; a job the writer is already applying is waited for, so a
+timeout always means the job was not written.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app import config
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[Session], Callable[[], Any]]
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int = 64,
+        linger_ms: float = 5,
+        timeout: Optional[float] = 30,
+    ):
+        self._session_factory = session_factory
+        self.max_batch = max_batch
+        self.linger = linger_ms / 1000
+        self.timeout = timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Commit everything already submitted, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            if thread.is_alive():
+                return
+        # Jobs that raced in behind the stop marker are never going to be written
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                self._fail([item], RuntimeError("Group commit writer stopped before the order was written"))
+
+    def submit(self, job: Job) -> Any:
+        """
+        Block until the batch containing ``job`` commits; return its result or
+        raise its error. Raises TimeoutError if the job is still queued after
+        ``timeout`` seconds; it is then withdrawn and never written.
+        """
+        self.start()
+        future: Future = Future()
+        self._queue.put((job, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise TimeoutError(f"Group commit did not start within {self.timeout}s")
+            # Already being written: its outcome is only moments away
+            return future.result()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Drop jobs whose caller timed out; the rest can no longer be cancelled
+            batch = [(job, future) for job, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Keep the writer alive and release every caller of this batch
+                logger.exception(f"Group commit of {len(batch)} jobs failed unexpectedly")
+                self._fail(batch, e)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Job, Future]], error: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit(self, batch: List[Tuple[Job, Future]]) -> None:
+        db = self._session_factory()
+        try:
+            finishers = [job(db) for job, _ in batch]
+            db.flush()
+            results = [finish() for finish in finishers]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                logger.warning(f"Group commit of {len(batch)} jobs failed ({e}), retrying individually")
+                for item in batch:
+                    self._commit([item])
+            return
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+order_writer = GroupCommitWriter(
+    SessionLocal,
+    max_batch=config.ORDER_GROUP_COMMIT_MAX_BATCH,
+    linger_ms=config.ORDER_GROUP_COMMIT_LINGER_MS,
+    timeout=config.ORDER_GROUP_COMMIT_TIMEOUT_SECONDS,
+)
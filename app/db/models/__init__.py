@@ -1,5 +1,6 @@
 from .order import Order, OrderPriority
 from .order_item import OrderItem
+from .order_snapshot import OrderSnapshot
 from .vendor import Vendor
 
-__all__ = ["Order", "OrderPriority", "OrderItem", "Vendor"]
\ No newline at end of file
+__all__ = ["Order", "OrderPriority", "OrderItem", "OrderSnapshot", "Vendor"]
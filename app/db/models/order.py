@@ -1,6 +1,6 @@
 # app/db/models/order.py
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Index, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index, ForeignKey, case, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -42,8 +42,23 @@ class Order(Base):
 
     __table_args__ = (
         Index("uq_order_vendor", "order_id", "vendor_id", unique=True),
-        Index("ix_vendor_id", "vendor_id"),
         Index("ix_priority", "priority"),
         Index("ix_status", "status"),
         Index("ix_created_at", "created_at"),
     )
+
+# Sort key of the vendor order listing: HIGH, MEDIUM, LOW. Rendered with
+# literals rather than bound parameters so a query ordering by it repeats the
+# exact expression of ix_vendor_priority_rank, and SQLite can read a vendor's
+# orders in index order instead of sorting them. The trailing priority column
+# lets priority-filtered counts be answered from the index alone; it is the only
+# index that starts with vendor_id, so the planner has no tie to break.
+PRIORITY_RANK = case(
+    *(
+        (Order.priority == literal_column(f"'{priority.value}'"), literal_column(str(rank)))
+        for rank, priority in enumerate((OrderPriority.HIGH, OrderPriority.MEDIUM, OrderPriority.LOW), 1)
+    ),
+    else_=literal_column("4"),
+)
+
+Index("ix_vendor_priority_rank", Order.vendor_id, PRIORITY_RANK, Order.created_at, Order.priority)
@@ -1,5 +1,5 @@
 # app/db/models/order_item.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -12,3 +12,7 @@ class OrderItem(Base):
     quantity = Column(Integer, nullable=False, default=1)
 
     order = relationship("Order", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+    )
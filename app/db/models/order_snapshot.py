@@ -0,0 +1,12 @@
+# app/db/models/order_snapshot.py
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class OrderSnapshot(Base):
+    __tablename__ = "order_snapshots"
+
+    id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    vendor_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,126 @@
+# app/db/order_snapshots.py
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from app.db.models.order import Order
+from app.db.models.order_item import OrderItem
+from app.db.models.order_snapshot import OrderSnapshot
+from app.schemas.order import OrderItemResponse
+from app.schemas.vendor import VendorResponse
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_order(order: Order, vendor=None) -> str:
+    """Compact JSON of everything in OrderResponse except the mutable status."""
+    vendor = vendor if vendor is not None else order.vendor
+    payload = {
+        "id": order.id,
+        "order_id": order.order_id,
+        "vendor": VendorResponse.model_validate(vendor).model_dump(mode="json"),
+        "priority": order.priority.value,
+        "items": [OrderItemResponse.model_validate(item).model_dump() for item in order.items],
+        "address": order.address,
+        "city": order.city,
+        "state": order.state,
+        "postal_code": order.postal_code,
+    }
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def build_snapshot(order: Order, vendor=None) -> OrderSnapshot:
+    # order.id and item ids must already be assigned (flush before calling)
+    return OrderSnapshot(id=order.id, vendor_id=order.vendor_id, payload=serialize_order(order, vendor))
+
+
+def snapshot_response(payload: str, status) -> dict:
+    data = json.loads(payload)
+    data["status"] = status.value if hasattr(status, "value") else status
+    return data
+
+
+def serve_orders(db: Session, vendor_id: int, rows: Iterable[Tuple[int, object, Optional[str]]]) -> List[dict]:
+    """
+    Turn one vendor's (order id, status, snapshot payload) rows into
+    OrderResponse dicts. Orders without a snapshot yet fall back to the
+    normalized tables; the vendor filter keeps that lookup on the vendor's
+    shard, where the order ids are unique.
+    """
+    rows = list(rows)
+    missing = [order_id for order_id, _, payload in rows if payload is None]
+    fallback: Dict[int, str] = {}
+    if missing:
+        logger.warning(f"{len(missing)} orders have no snapshot, reading normalized tables")
+        # One joined query: a separate IN (...) load of the items would carry no
+        # vendor filter and be sent to every shard
+        orders = db.query(Order).outerjoin(Order.items).options(
+            contains_eager(Order.items), joinedload(Order.vendor)
+        ).filter(Order.vendor_id == vendor_id, Order.id.in_(missing)).order_by(Order.id, OrderItem.id).all()
+        fallback = {order.id: serialize_order(order) for order in orders}
+
+    return [
+        snapshot_response(payload if payload is not None else fallback[order_id], status)
+        for order_id, status, payload in rows
+    ]
+
+
+def _order_batches(db: Session, batch_size: int):
+    last_id = 0
+    while True:
+        batch = db.query(Order).options(
+            selectinload(Order.items), selectinload(Order.vendor)
+        ).filter(Order.id > last_id).order_by(Order.id).limit(batch_size).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield batch
+        db.expunge_all()
+
+
+def check_snapshots(db: Session, batch_size: int = 500) -> Dict[str, List[int]]:
+    """Compare every snapshot with the normalized tables it was built from."""
+    report = {"missing": [], "stale": [], "orphaned": []}
+
+    for batch in _order_batches(db, batch_size):
+        ids = [order.id for order in batch]
+        stored = dict(
+            db.query(OrderSnapshot.id, OrderSnapshot.payload).filter(OrderSnapshot.id.in_(ids)).all()
+        )
+        for order in batch:
+            if order.id not in stored:
+                report["missing"].append(order.id)
+            elif stored[order.id] != serialize_order(order):
+                report["stale"].append(order.id)
+
+    orphaned = db.query(OrderSnapshot.id).outerjoin(
+        Order, Order.id == OrderSnapshot.id
+    ).filter(Order.id.is_(None)).all()
+    report["orphaned"] = [row.id for row in orphaned]
+
+    return report
+
+
+def rebuild_snapshots(db: Session, batch_size: int = 500, only_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute snapshots from the normalized tables, one transaction per batch."""
+    only_ids = set(only_ids) if only_ids is not None else None
+    rebuilt = 0
+
+    db.query(OrderSnapshot).filter(
+        ~OrderSnapshot.id.in_(select(Order.id))
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    for batch in _order_batches(db, batch_size):
+        if only_ids is not None:
+            batch = [order for order in batch if order.id in only_ids]
+            if not batch:
+                continue
+        for order in batch:
+            db.merge(build_snapshot(order))
+        db.commit()
+        rebuilt += len(batch)
+        logger.info(f"Rebuilt {rebuilt} order snapshots")
+
+    return rebuilt
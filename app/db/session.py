@@ -1,6 +1,9 @@
 # app/db/session.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.horizontal_shard import ShardedSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app import config
+from app.db.shards import ShardRouter, create_shard_engines, shard_urls, directory_metadata
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
 
@@ -9,11 +12,76 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+shard_router = None
+if config.DB_SHARD_COUNT > 0:
+    shard_router = ShardRouter(
+        create_shard_engines(shard_urls(config.DB_SHARD_COUNT, config.DB_SHARD_URL_TEMPLATE))
+    )
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, class_=ShardedSession, **shard_router.session_kwargs()
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+# Indexes replaced by newer ones; create_all never drops anything
+RETIRED_INDEXES = ("ix_vendor_id",)
+
+
+def upgrade_schema(bind):
+    """
+    Bring a database created by an earlier version up to the models.
+    create_all skips tables that already exist, so indexes added to existing
+    tables are created here. Every step is idempotent.
+    """
+    with bind.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+
+        for name in RETIRED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+        # Looked up by name: reflection skips expression indexes
+        existing = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+        for table in Base.metadata.sorted_tables:
+            if table.name in tables:
+                for index in sorted(table.indexes, key=lambda index: index.name):
+                    if index.name not in existing:
+                        index.create(conn)
+
+
+def init_db():
+    if shard_router is None:
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+        return
+
+    directory_metadata.create_all(bind=engine)
+    for shard_engine in shard_router.engines.values():
+        Base.metadata.create_all(bind=shard_engine)
+        upgrade_schema(shard_engine)
+
+
+def engine_for_vendor(vendor_id: int):
+    """Engine holding this vendor's rows, for bulk Core statements that bypass the ORM."""
+    if shard_router is None:
+        return engine
+    return shard_router.engines[shard_router.shard_for(vendor_id)]
+
+
+def shard_sessions():
+    """One plain session per database file (just SessionLocal when unsharded)."""
+    if shard_router is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    else:
+        yield from shard_router.shard_sessions(autocommit=False, autoflush=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,147 @@
+# app/db/shards.py
+"""
+Per-vendor shard routing on top of SQLAlchemy's horizontal sharding extension.
+
+Every vendor, with all of its orders, items and snapshots, lives in shard
+``vendor_id % N``. Vendor ids come from a small directory table in the primary
+database so they are unique across shards and known before the insert. Order
+primary keys are only unique within a shard; (order_id, vendor_id) remains the
+global key.
+
+Statements that compare ``orders.vendor_id``, ``order_snapshots.vendor_id`` or
+``vendors.id`` with a literal run on that vendor's shard. Everything else
+(e.g. ``get_vendors``, status lookups by order number) is scattered to every
+shard and the results are gathered into one result. Relationship loads such
+as ``Order.items`` go to the shard the parent row came from.
+"""
+from typing import Dict, Iterator, List
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, delete, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.schema import Column as SchemaColumn
+
+ROUTING_COLUMNS = {
+    ("orders", "vendor_id"),
+    ("order_snapshots", "vendor_id"),
+    ("vendors", "id"),
+}
+
+directory_metadata = MetaData()
+
+vendor_directory = Table(
+    "vendor_directory",
+    directory_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, unique=True, nullable=False),
+)
+
+
+def shard_urls(count: int, template: str) -> List[str]:
+    return [template.format(shard=n) for n in range(count)]
+
+
+def create_shard_engines(urls: List[str]) -> Dict[str, Engine]:
+    return {
+        str(n): create_engine(url, connect_args={"check_same_thread": False})
+        for n, url in enumerate(urls)
+    }
+
+
+class ShardRouter:
+    def __init__(self, engines: Dict[str, Engine]):
+        self.engines = engines
+
+    @property
+    def shard_ids(self) -> List[str]:
+        return list(self.engines)
+
+    def shard_for(self, vendor_id: int) -> str:
+        return str(int(vendor_id) % len(self.engines))
+
+    def shard_chooser(self, mapper, instance, **kw) -> str:
+        if instance is None:
+            raise ValueError(f"Cannot choose a shard for {mapper} without an instance")
+
+        table = mapper.local_table.name
+        if table == "vendors":
+            vendor_id = instance.id
+        elif table == "order_items":
+            vendor_id = instance.order.vendor_id
+        else:
+            vendor_id = instance.vendor_id
+
+        if vendor_id is None:
+            raise ValueError(f"Cannot choose a shard for {table} row without a vendor id")
+        return self.shard_for(vendor_id)
+
+    def identity_chooser(self, mapper, primary_key, *, lazy_loaded_from, **kw) -> List[str]:
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token is not None:
+            return [lazy_loaded_from.identity_token]
+        if mapper.local_table.name == "vendors":
+            return [self.shard_for(primary_key[0])]
+        # Any shard may hold a row with this id, and they are different rows
+        raise ValueError(
+            f"{mapper.local_table.name} ids are only unique within a shard; "
+            f"pass identity_token or query by vendor"
+        )
+
+    def execute_chooser(self, orm_context) -> List[str]:
+        # Relationship loads (e.g. Order.items) stay on the parent's shard
+        if orm_context.is_select and orm_context.lazy_loaded_from is not None:
+            return [orm_context.lazy_loaded_from.identity_token]
+        vendor_ids = self.vendor_ids_in(orm_context.statement)
+        if vendor_ids:
+            return sorted({self.shard_for(vendor_id) for vendor_id in vendor_ids})
+        return self.shard_ids
+
+    @staticmethod
+    def vendor_ids_in(statement) -> set:
+        """Literal vendor ids compared with ``==`` anywhere in the statement."""
+        vendor_ids = set()
+
+        def visit_binary(binary):
+            if binary.operator is not operators.eq:
+                return
+            column, value = binary.left, binary.right
+            if isinstance(column, BindParameter):
+                column, value = value, column
+            if not (isinstance(column, SchemaColumn) and isinstance(value, BindParameter)):
+                return
+            if (column.table.name, column.name) in ROUTING_COLUMNS and value.effective_value is not None:
+                vendor_ids.add(value.effective_value)
+
+        visitors.traverse(statement, {}, {"binary": visit_binary})
+        return vendor_ids
+
+    def session_kwargs(self) -> dict:
+        """Arguments for ``sessionmaker(class_=ShardedSession, ...)``."""
+        return {
+            "shards": self.engines,
+            "shard_chooser": self.shard_chooser,
+            "identity_chooser": self.identity_chooser,
+            "execute_chooser": self.execute_chooser,
+        }
+
+    def shard_sessions(self, **kwargs) -> Iterator[Session]:
+        """Plain per-shard sessions for maintenance jobs that walk each file in turn."""
+        for engine in self.engines.values():
+            db = Session(bind=engine, **kwargs)
+            try:
+                yield db
+            finally:
+                db.close()
+
+
+def allocate_vendor_id(directory_engine: Engine, name: str) -> int:
+    """Reserve a globally unique vendor id. Raises IntegrityError for a taken name."""
+    with directory_engine.begin() as conn:
+        result = conn.execute(insert(vendor_directory).values(name=name))
+        return result.inserted_primary_key[0]
+
+
+def release_vendor_id(directory_engine: Engine, vendor_id: int) -> None:
+    """Give back a reservation whose vendor never made it into its shard."""
+    with directory_engine.begin() as conn:
+        conn.execute(delete(vendor_directory).where(vendor_directory.c.id == vendor_id))
@@ -1,15 +1,27 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from app.db.session import engine, Base, SessionLocal
+from app.db.session import init_db
 from app.db.models import Order
 from app.api import orders, vendors
 from app.utils.rate_limiter import limiter
+from app.utils.admission import admission
+from app.db.group_commit import order_writer
+from app.background.status_writer import status_writer
 
-app = FastAPI(title="Order Processing", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Commit any orders and status transitions still waiting to be written
+    await asyncio.to_thread(order_writer.stop)
+    await status_writer.stop()
+
+app = FastAPI(title="Order Processing", version="1.0", lifespan=lifespan)
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -22,7 +34,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
+init_db()
 
 app.include_router(orders.router)
 app.include_router(vendors.router)
@@ -32,3 +44,7 @@ add_pagination(app)
 @app.get("/")
 def read_root():
     return {"message": "Welcome to my Order Processing System!"}
+
+@app.get("/admission")
+def admission_stats():
+    return admission.stats()
@@ -0,0 +1,332 @@
+# app/tools/import_orders.py
+"""
+Bulk-load historical orders from an NDJSON file (one OrderCreate per line),
+bypassing the rate-limited API.
+
+    python -m app.tools.import_orders orders.ndjson
+    python -m app.tools.import_orders orders.ndjson --processing enqueue --chunk-size 2000
+
+Lines are validated with the OrderCreate schema in a process pool and
+inserted in one transaction per chunk (per shard). Orders that already exist
+for their vendor (uq_order_vendor) are skipped through ON CONFLICT DO
+NOTHING. Invalid lines, unknown vendors and, with --duplicates reject,
+duplicates are written to the reject file with the reason. Only a bounded
+number of chunks is in flight at any time, so memory stays flat however
+large the file is.
+
+--processing skip (default) stores the orders as PROCESSED, since backfilled
+orders were fulfilled long ago. --processing enqueue stores them as PENDING
+and hands them to a pool of --concurrency workers running the normal
+background processors on an event loop thread. The pool queues at most
+--concurrency orders besides the ones being processed; once it is full the
+reader waits for a worker, so memory stays bounded and a large enqueued
+import runs at processing speed (about --concurrency orders per 6-12s).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from types import SimpleNamespace
+from typing import Iterable, Iterator, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import config
+from app.db.session import Base, init_db, engine_for_vendor, shard_sessions
+from app.db import models  # noqa: F401  (registers every table on Base)
+from app.db.models.order import OrderPriority, OrderStatus
+from app.db.order_snapshots import serialize_order
+from app.schemas.order import OrderCreate
+from app.schemas.vendor import VendorResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+orders = Base.metadata.tables["orders"]
+order_items = Base.metadata.tables["order_items"]
+order_snapshots = Base.metadata.tables["order_snapshots"]
+vendors = Base.metadata.tables["vendors"]
+
+
+def validate_lines(lines: List[Tuple[int, str]]):
+    """Runs in the worker processes: parse and validate one chunk of lines."""
+    valid, rejected = [], []
+    for line_no, raw in lines:
+        try:
+            order = OrderCreate.model_validate(json.loads(raw))
+        except json.JSONDecodeError as e:
+            rejected.append((line_no, raw, f"invalid JSON: {e}"))
+            continue
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            rejected.append((line_no, raw, errors))
+            continue
+        valid.append((line_no, raw, order.model_dump(mode="json")))
+    return valid, rejected
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    with open(path, encoding="utf-8") as f:
+        numbered = ((n, line.rstrip("\n")) for n, line in enumerate(f, 1) if line.strip())
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def bounded_map(executor, func, chunks: Iterable, max_in_flight: int):
+    """Like executor.map, but never reads more than max_in_flight chunks ahead."""
+    if executor is None:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    pending = []
+    for chunk in chunks:
+        pending.append(executor.submit(func, chunk))
+        if len(pending) >= max_in_flight:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def load_vendors():
+    known = {}
+    for db in shard_sessions():
+        for row in db.execute(select(vendors)).all():
+            known[row.id] = VendorResponse.model_validate(row._mapping)
+    return known
+
+
+def insert_chunk(valid, vendor_data, status: OrderStatus):
+    """
+    Insert one validated chunk, one transaction per database. Returns the
+    (line, raw) of rows skipped as duplicates and the (id, vendor_id, priority)
+    of inserted orders.
+    """
+    by_engine = defaultdict(list)
+    for row in valid:
+        by_engine[engine_for_vendor(row[2]["vendor_id"])].append(row)
+
+    duplicates, inserted = [], []
+    for target, rows in by_engine.items():
+        order_rows = [{
+            "order_id": data["order_id"],
+            "vendor_id": data["vendor_id"],
+            "priority": OrderPriority(data["priority"] or OrderPriority.LOW.value),
+            "status": status,
+            "address": data["address"],
+            "city": data["city"],
+            "state": data["state"],
+            "postal_code": data["postal_code"],
+        } for _, _, data in rows]
+
+        with target.begin() as conn:
+            stmt = (
+                sqlite_insert(orders)
+                .on_conflict_do_nothing(index_elements=["order_id", "vendor_id"])
+                .returning(orders.c.id, orders.c.order_id, orders.c.vendor_id)
+            )
+            new_ids = {(r.order_id, r.vendor_id): r.id for r in conn.execute(stmt, order_rows)}
+
+            item_rows, created = [], []
+            for line_no, raw, data in rows:
+                pk = new_ids.pop((data["order_id"], data["vendor_id"]), None)
+                if pk is None:
+                    duplicates.append((line_no, raw))
+                    continue
+                created.append((pk, data))
+                item_rows.extend(
+                    {"order_id": pk, "item_name": item["item_name"], "quantity": item["quantity"]}
+                    for item in data["items"]
+                )
+
+            if item_rows:
+                returned = conn.execute(
+                    order_items.insert().returning(
+                        order_items.c.id, order_items.c.order_id,
+                        order_items.c.item_name, order_items.c.quantity,
+                    ),
+                    item_rows,
+                ).all()
+            else:
+                returned = []
+
+            if config.ORDER_READ_MODEL_ENABLED and created:
+                items_by_order = defaultdict(list)
+                for item in returned:
+                    items_by_order[item.order_id].append(item)
+                conn.execute(order_snapshots.insert(), [
+                    {
+                        "id": pk,
+                        "vendor_id": data["vendor_id"],
+                        "payload": serialize_order(SimpleNamespace(
+                            id=pk,
+                            items=sorted(items_by_order[pk], key=lambda item: item.id),
+                            priority=OrderPriority(data["priority"] or OrderPriority.LOW.value),
+                            **{k: data[k] for k in ("order_id", "address", "city", "state", "postal_code")},
+                        ), vendor_data[data["vendor_id"]]),
+                    }
+                    for pk, data in created
+                ])
+
+        inserted.extend((pk, data["vendor_id"], data["priority"]) for pk, data in created)
+
+    return duplicates, inserted
+
+
+class ProcessingPool:
+    """
+    Runs the background processors for imported orders alongside the reader.
+    submit() queues (id, vendor_id, priority) tuples for ``concurrency``
+    worker coroutines on a private event loop thread, and blocks while
+    ``concurrency`` orders are already waiting for a worker.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.submitted = 0
+        self.processed = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="import-processing", daemon=True)
+        self._queue: "asyncio.Queue" = None
+        self._workers = None
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
+
+    async def _start_workers(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.concurrency)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def _work(self) -> None:
+        from app.background.order_processing import process_order_background, process_high_priority_order
+
+        while True:
+            order = await self._queue.get()
+            if order is None:
+                return
+            pk, vendor_id, priority = order
+            if priority == OrderPriority.HIGH.value:
+                await process_high_priority_order(pk, vendor_id)
+            else:
+                await process_order_background(pk, vendor_id)
+            self.processed += 1
+
+    def submit(self, inserted) -> None:
+        asyncio.run_coroutine_threadsafe(self._put(inserted), self._loop).result()
+
+    async def _put(self, inserted) -> None:
+        for order in inserted:
+            await self._queue.put(order)
+            self.submitted += 1
+
+    @property
+    def pending(self) -> int:
+        """Orders queued or being processed."""
+        return self.submitted - self.processed
+
+    def finish(self) -> None:
+        """Wait until every submitted order is processed and its status written."""
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _drain(self) -> None:
+        from app.background.status_writer import status_writer
+
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+        await status_writer.stop()
+
+
+def write_rejects(reject_file, rows):
+    for line_no, raw, reason in rows:
+        reject_file.write(json.dumps({"line": line_no, "reason": reason, "record": raw}) + "\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stream an NDJSON file of orders into the database")
+    parser.add_argument("path", help="NDJSON file, one OrderCreate record per line")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="orders per insert transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="validation processes (0 validates in this process)")
+    parser.add_argument("--reject-file", help="default: <path>.rejects.ndjson")
+    parser.add_argument("--duplicates", choices=["skip", "reject"], default="skip",
+                        help="only count existing orders, or also write them to the reject file")
+    parser.add_argument("--processing", choices=["skip", "enqueue"], default="skip",
+                        help="store as PROCESSED, or as PENDING and run the background processors")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="orders processed at once with --processing enqueue; ingest waits when that many more are queued")
+    args = parser.parse_args(argv)
+
+    init_db()
+    vendor_data = load_vendors()
+    status = OrderStatus.PROCESSED if args.processing == "skip" else OrderStatus.PENDING
+    reject_path = args.reject_file or f"{args.path}.rejects.ndjson"
+
+    totals = defaultdict(int)
+    started = time.monotonic()
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+    pool = None
+    if args.processing == "enqueue":
+        pool = ProcessingPool(args.concurrency)
+        pool.start()
+    try:
+        with open(reject_path, "w", encoding="utf-8") as reject_file:
+            chunks = read_chunks(args.path, args.chunk_size)
+            for valid, rejected in bounded_map(executor, validate_lines, chunks, max(2, args.workers * 2)):
+                totals["read"] += len(valid) + len(rejected)
+                unknown = [row for row in valid if row[2]["vendor_id"] not in vendor_data]
+                valid = [row for row in valid if row[2]["vendor_id"] in vendor_data]
+                rejected += [(line_no, raw, "Vendor not found") for line_no, raw, _ in unknown]
+
+                duplicates, inserted = insert_chunk(valid, vendor_data, status)
+                if args.duplicates == "reject":
+                    rejected += [(line_no, raw, "Duplicate order for this vendor") for line_no, raw in duplicates]
+                write_rejects(reject_file, rejected)
+
+                if pool is not None:
+                    pool.submit(inserted)
+
+                totals["inserted"] += len(inserted)
+                totals["duplicates"] += len(duplicates)
+                totals["rejected"] += len(rejected)
+
+                elapsed = time.monotonic() - started
+                processing = f", {pool.processed} processed, {pool.pending} pending" if pool is not None else ""
+                logger.info(
+                    f"{totals['read']} lines, {totals['inserted']} inserted, {totals['duplicates']} duplicates, "
+                    f"{totals['rejected']} rejected{processing} - {totals['inserted'] / elapsed:.0f} orders/s"
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if pool is not None:
+            logger.info(
+                f"Ingest finished after {time.monotonic() - started:.1f}s, "
+                f"waiting for {pool.pending} orders to be processed"
+            )
+            pool.finish()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Done in {elapsed:.1f}s: {totals['inserted']} inserted, {totals['duplicates']} duplicates, "
+        f"{totals['rejected']} rejected (see {reject_path})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
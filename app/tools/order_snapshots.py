@@ -0,0 +1,49 @@
+# app/tools/order_snapshots.py
+"""
+Check or rebuild the denormalized order read model.
+
+    python -m app.tools.order_snapshots check
+    python -m app.tools.order_snapshots rebuild [--only-inconsistent]
+"""
+import argparse
+import logging
+import sys
+from app.db.session import init_db, shard_sessions
+from app.db import models  # noqa: F401  (registers every table on Base)
+from app.db.order_snapshots import check_snapshots, rebuild_snapshots
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Order snapshot read model maintenance")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--only-inconsistent", action="store_true",
+                        help="rebuild only missing or stale snapshots")
+    args = parser.parse_args(argv)
+
+    init_db()
+    inconsistent = False
+    # Order ids are only unique within one database file, so walk each shard on its own
+    for db in shard_sessions():
+        if args.command == "check":
+            report = check_snapshots(db, batch_size=args.batch_size)
+            for kind, ids in report.items():
+                logger.info(f"{db.bind.url.database} {kind}: {len(ids)}" + (f" (e.g. {ids[:10]})" if ids else ""))
+            inconsistent = inconsistent or any(report.values())
+            continue
+
+        only_ids = None
+        if args.only_inconsistent:
+            report = check_snapshots(db, batch_size=args.batch_size)
+            only_ids = report["missing"] + report["stale"]
+        rebuilt = rebuild_snapshots(db, batch_size=args.batch_size, only_ids=only_ids)
+        logger.info(f"{db.bind.url.database}: rebuilt {rebuilt} order snapshots")
+
+    return 1 if inconsistent else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# app/tools/reshard.py
+"""
+Copy vendors, orders and items from one storage layout into another.
+
+    # single app.db -> 4 shards
+    python -m app.tools.reshard --to-shards 4
+    # 4 shards -> 8 shards in a new set of files
+    python -m app.tools.reshard --from-shards 4 --to-shards 8 \
+        --to-template "sqlite:///./app_v2_shard_{shard}.db"
+
+Vendor ids are preserved. Order ids are only unique per shard, so orders get
+new ids in their target shard and their items are re-pointed. Snapshots are
+rebuilt in the target rather than copied. The source is left untouched; point
+DB_SHARD_COUNT / DB_SHARD_URL_TEMPLATE at the target once the copy is done.
+"""
+import argparse
+import logging
+import sys
+from sqlalchemy import create_engine, func, insert, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import config
+from app.db.session import Base, SQLALCHEMY_DATABASE_URL, upgrade_schema
+from app.db import models  # noqa: F401  (registers every table on Base)
+from app.db.order_snapshots import rebuild_snapshots
+from app.db.shards import ShardRouter, create_shard_engines, shard_urls, directory_metadata, vendor_directory
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+vendors = Base.metadata.tables["vendors"]
+orders = Base.metadata.tables["orders"]
+order_items = Base.metadata.tables["order_items"]
+order_snapshots = Base.metadata.tables["order_snapshots"]
+
+
+def _layout(count: int, template: str):
+    if count > 0:
+        return shard_urls(count, template)
+    return [SQLALCHEMY_DATABASE_URL]
+
+
+def copy_vendor(source, target, vendor_row, batch_size: int) -> int:
+    """Copy one vendor and its orders; one target transaction per batch of orders."""
+    with target.begin() as conn:
+        conn.execute(insert(vendors).values(**vendor_row._mapping))
+
+    copied = 0
+    last_id = 0
+    while True:
+        batch = source.execute(
+            select(orders)
+            .where(orders.c.vendor_id == vendor_row.id, orders.c.id > last_id)
+            .order_by(orders.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return copied
+        last_id = batch[-1].id
+
+        items = source.execute(
+            select(order_items).where(order_items.c.order_id.in_([row.id for row in batch]))
+        ).all()
+
+        with target.begin() as conn:
+            new_ids = {}
+            for row in batch:
+                values = dict(row._mapping)
+                old_id = values.pop("id")
+                new_ids[old_id] = conn.execute(insert(orders).values(**values)).inserted_primary_key[0]
+            if items:
+                conn.execute(insert(order_items), [
+                    {"order_id": new_ids[item.order_id], "item_name": item.item_name, "quantity": item.quantity}
+                    for item in items
+                ])
+        copied += len(batch)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate or rebalance data between shard layouts")
+    parser.add_argument("--from-shards", type=int, default=0, help="0 means the single app.db")
+    parser.add_argument("--from-template", default=config.DB_SHARD_URL_TEMPLATE)
+    parser.add_argument("--to-shards", type=int, required=True)
+    parser.add_argument("--to-template", default=config.DB_SHARD_URL_TEMPLATE)
+    parser.add_argument("--directory-url", default=SQLALCHEMY_DATABASE_URL,
+                        help="database holding the vendor id directory")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.to_shards < 1:
+        parser.error("--to-shards must be at least 1")
+
+    source_urls = _layout(args.from_shards, args.from_template)
+    target_urls = _layout(args.to_shards, args.to_template)
+    overlap = set(source_urls) & set(target_urls)
+    if overlap:
+        parser.error(f"source and target share databases: {sorted(overlap)}; use a different --to-template")
+
+    router = ShardRouter(create_shard_engines(target_urls))
+    for engine in router.engines.values():
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+        with engine.connect() as conn:
+            if conn.execute(select(func.count()).select_from(vendors)).scalar():
+                logger.error(f"Target {engine.url} already has vendors, refusing to merge into it")
+                return 1
+
+    directory = create_engine(args.directory_url)
+    directory_metadata.create_all(bind=directory)
+
+    rebuild = False
+    for url in source_urls:
+        source_engine = create_engine(url)
+        with source_engine.connect() as source:
+            if inspect(source).has_table(order_snapshots.name):
+                rebuild = rebuild or bool(
+                    source.execute(select(func.count()).select_from(order_snapshots)).scalar()
+                )
+
+            for vendor_row in source.execute(select(vendors).order_by(vendors.c.id)).all():
+                target = router.engines[router.shard_for(vendor_row.id)]
+                copied = copy_vendor(source, target, vendor_row, args.batch_size)
+                with directory.begin() as conn:
+                    conn.execute(
+                        sqlite_insert(vendor_directory)
+                        .values(id=vendor_row.id, name=vendor_row.name)
+                        .on_conflict_do_nothing()
+                    )
+                logger.info(f"Vendor {vendor_row.id} ({vendor_row.name}): {copied} orders -> {target.url}")
+        source_engine.dispose()
+
+    if rebuild:
+        for engine in router.engines.values():
+            with Session(bind=engine) as db:
+                rebuilt = rebuild_snapshots(db)
+                logger.info(f"{engine.url}: rebuilt {rebuilt} order snapshots")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
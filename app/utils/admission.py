@@ -0,0 +1,95 @@
+# app/utils/admission.py
+import functools
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+from fastapi import HTTPException
+from app import config
+from app.schemas.order import OrderPriority
+
+
+class AdmissionController:
+    """
+    Tracks background processing backlog and DB write latency and decides
+    whether a new order may be accepted. HIGH priority is always admitted.
+    """
+
+    def __init__(self, latency_alpha: float = 0.2):
+        self._lock = threading.Lock()
+        self._alpha = latency_alpha
+        self.backlog = 0
+        self.write_latency_ms = 0.0
+        self._last_write = 0.0
+        self.admitted = Counter()
+        self.shed = Counter()
+
+    def overloaded(self) -> Optional[str]:
+        if self.backlog >= config.ADMISSION_MAX_BACKLOG:
+            return f"background backlog {self.backlog} >= {config.ADMISSION_MAX_BACKLOG}"
+        # Shedding stops the latency samples, so forget a stale reading instead
+        # of rejecting forever on it
+        if time.monotonic() - self._last_write > config.ADMISSION_LATENCY_STALE_SECONDS:
+            self.write_latency_ms = 0.0
+        if self.write_latency_ms >= config.ADMISSION_MAX_WRITE_LATENCY_MS:
+            return f"db write latency {self.write_latency_ms:.0f}ms >= {config.ADMISSION_MAX_WRITE_LATENCY_MS:.0f}ms"
+        return None
+
+    def admit(self, priority: OrderPriority) -> None:
+        """Raise 503 with Retry-After when the order should be shed."""
+        priority = priority or OrderPriority.LOW
+        with self._lock:
+            reason = None
+            if config.ADMISSION_CONTROL_ENABLED and priority != OrderPriority.HIGH:
+                reason = self.overloaded()
+            if reason:
+                self.shed[priority.value] += 1
+            else:
+                self.admitted[priority.value] += 1
+
+        if reason:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server overloaded ({reason}), retry later",
+                headers={"Retry-After": str(config.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+
+    def record_write_latency(self, seconds: float) -> None:
+        with self._lock:
+            sample = seconds * 1000
+            self._last_write = time.monotonic()
+            self.write_latency_ms += self._alpha * (sample - self.write_latency_ms)
+
+    def track(self, func: Callable) -> Callable:
+        """
+        Wrap a background coroutine so it counts toward the backlog while it runs.
+        The count starts inside the wrapper: Starlette skips background tasks when
+        sending the response fails, and a task that never runs must not count.
+        """
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with self._lock:
+                self.backlog += 1
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.backlog -= 1
+
+        return wrapper
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backlog": self.backlog,
+                "write_latency_ms": round(self.write_latency_ms, 2),
+                "high_watermarks": {
+                    "backlog": config.ADMISSION_MAX_BACKLOG,
+                    "write_latency_ms": config.ADMISSION_MAX_WRITE_LATENCY_MS,
+                },
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+            }
+
+
+admission = AdmissionController()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def pytest_configure(config):
+    # The app's engine resolves ./app.db when app.db.session is first imported,
+    # which may happen while test modules are collected; move to a scratch
+    # directory before that so the real database is never touched
+    config.app_cwd = os.getcwd()
+    config.scratch_dir = tempfile.mkdtemp(prefix="app-tests-")
+    os.chdir(config.scratch_dir)
+
+
+def pytest_unconfigure(config):
+    os.chdir(config.app_cwd)
+    shutil.rmtree(config.scratch_dir, ignore_errors=True)
+
+
+def sqlite_engine(path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+@pytest.fixture
+def db_factory(tmp_path):
+    """Session factory for a fresh database file with every table created."""
+    from app.db.session import Base
+    from app.db import models  # noqa: F401  (registers every table on Base)
+
+    engine = sqlite_engine(tmp_path / "test.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    """
+    Build a TestClient whose requests get sessions from the given factory, with
+    the rate limit off and background processing replaced by a no-op.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db.session import get_db
+    from app.api import orders as orders_api
+
+    async def skip_processing(order_id, vendor_id=None):
+        pass
+
+    monkeypatch.setattr(orders_api, "process_order_background", skip_processing)
+    monkeypatch.setattr(orders_api, "process_high_priority_order", skip_processing)
+
+    def make(session_factory):
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        return TestClient(app)
+
+    app.state.limiter.enabled = False
+    yield make
+    app.dependency_overrides.clear()
+    app.state.limiter.enabled = True
+
+
+def order_payload(order_id, vendor_id, priority="LOW"):
+    return {
+        "order_id": order_id,
+        "vendor_id": vendor_id,
+        "priority": priority,
+        "items": [{"item_name": f"Item for {order_id}", "quantity": 2}],
+        "address": "123 Test Street",
+        "city": "Test City",
+        "state": "Test State",
+        "postal_code": "12345"
+    }
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import config
+from app.schemas.order import OrderPriority
+from app.utils.admission import AdmissionController
+from tests.conftest import order_payload
+
+
+def test_backlog_counts_only_tasks_that_run():
+    controller = AdmissionController()
+    seen = []
+
+    async def task():
+        seen.append(controller.backlog)
+
+    wrapped = controller.track(task)
+    # Starlette drops background tasks when sending the response fails
+    controller.track(task)
+    assert controller.backlog == 0
+
+    asyncio.run(wrapped())
+    assert seen == [1]
+    assert controller.backlog == 0
+
+
+def test_backlog_released_when_task_fails():
+    controller = AdmissionController()
+
+    async def task():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(controller.track(task)())
+    assert controller.backlog == 0
+
+
+def test_sheds_low_and_medium_over_backlog_watermark(monkeypatch):
+    monkeypatch.setattr(config, "ADMISSION_MAX_BACKLOG", 2)
+    monkeypatch.setattr(config, "ADMISSION_RETRY_AFTER_SECONDS", 7)
+    controller = AdmissionController()
+    controller.backlog = 2
+
+    for priority in (OrderPriority.LOW, OrderPriority.MEDIUM):
+        with pytest.raises(HTTPException) as exc:
+            controller.admit(priority)
+        assert exc.value.status_code == 503
+        assert exc.value.headers == {"Retry-After": "7"}
+
+    controller.admit(OrderPriority.HIGH)
+
+    controller.backlog = 1
+    controller.admit(OrderPriority.LOW)
+
+    stats = controller.stats()
+    assert stats["shed"] == {"LOW": 1, "MEDIUM": 1}
+    assert stats["admitted"] == {"HIGH": 1, "LOW": 1}
+
+
+def test_stale_write_latency_is_forgotten(monkeypatch):
+    monkeypatch.setattr(config, "ADMISSION_MAX_WRITE_LATENCY_MS", 100)
+    monkeypatch.setattr(config, "ADMISSION_LATENCY_STALE_SECONDS", 30)
+    monkeypatch.setattr(config, "ADMISSION_RETRY_AFTER_SECONDS", 1)
+    controller = AdmissionController(latency_alpha=1.0)
+
+    controller.record_write_latency(0.5)
+    assert "latency" in controller.overloaded()
+
+    controller._last_write -= 60
+    assert controller.overloaded() is None
+
+
+def test_create_order_sheds_with_retry_after(monkeypatch, db_factory, make_client):
+    from app import main
+    from app.api import orders as orders_api
+
+    controller = AdmissionController()
+    monkeypatch.setattr(orders_api, "admission", controller)
+    monkeypatch.setattr(main, "admission", controller)
+    monkeypatch.setattr(config, "ADMISSION_MAX_BACKLOG", 1)
+
+    client = make_client(db_factory)
+    vendor = client.post("/vendors/", json={"name": "Busy Vendor", "email": "busy@test.com"}).json()
+
+    controller.backlog = 1
+    response = client.post("/orders/", json=order_payload("SHED_LOW", vendor["id"], "LOW"))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(config.ADMISSION_RETRY_AFTER_SECONDS)
+
+    response = client.post("/orders/", json=order_payload("KEEP_HIGH", vendor["id"], "HIGH"))
+    assert response.status_code == 200
+
+    stats = client.get("/admission").json()
+    assert stats["shed"] == {"LOW": 1}
+    assert stats["admitted"] == {"HIGH": 1}
+    assert stats["backlog"] == 1
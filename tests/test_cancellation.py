@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from app.background import order_processing
+from app.background import status_writer as status_writer_module
+from app.background.cancellation import CancellationRegistry, cancellations
+from app.background.status_writer import status_writer
+from tests.conftest import order_payload
+
+
+@pytest.fixture
+def client(db_factory, make_client):
+    client = make_client(db_factory)
+    for vendor_id in (1, 2):
+        client.post("/vendors/", json={"name": f"Vendor {vendor_id}", "email": f"v{vendor_id}@test.com"})
+    return client
+
+
+@pytest.fixture
+def steps(monkeypatch, db_factory):
+    """Run the processors against the test database without their delays."""
+    monkeypatch.setattr(order_processing, "SessionLocal", db_factory)
+    monkeypatch.setattr(status_writer_module, "SessionLocal", db_factory)
+    real_sleep = asyncio.sleep
+    taken = []
+
+    async def fast_sleep(seconds):
+        if seconds:
+            taken.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(order_processing.asyncio, "sleep", fast_sleep)
+    return taken
+
+
+def create(client, order_id, vendor_id):
+    response = client.post("/orders/", json=order_payload(order_id, vendor_id))
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def status(client, order_id, vendor_id):
+    orders = client.get(f"/orders/{vendor_id}").json()
+    return next(order["status"] for order in orders if order["order_id"] == order_id)
+
+
+def run_processor(order_pk, vendor_id):
+    async def run():
+        await order_processing.process_order_background(order_pk, vendor_id)
+        await status_writer.stop()
+    asyncio.run(run())
+
+
+def test_registry_only_flags_running_processors():
+    registry = CancellationRegistry()
+    assert registry.cancel(1, 1) is False
+    assert len(registry) == 0
+
+    registry.start(1, 1)
+    assert registry.is_cancelled(1, 1) is False
+    assert registry.cancel(1, 1) is True
+    assert registry.is_cancelled(1, 1) is True
+    assert registry.is_cancelled(1, 2) is False
+
+    registry.finish(1, 1)
+    assert len(registry) == 0
+    assert registry.is_cancelled(1, 1) is False
+
+
+def test_ambiguous_order_number_is_not_cancelled(client):
+    create(client, "DUP", 1)
+    create(client, "DUP", 2)
+
+    response = client.post("/orders/DUP/cancel")
+    assert response.status_code == 409
+    assert status(client, "DUP", 1) == status(client, "DUP", 2) == "PENDING"
+
+    response = client.post("/orders/DUP/cancel?vendor_id=2")
+    assert response.status_code == 200
+    assert status(client, "DUP", 1) == "PENDING"
+    assert status(client, "DUP", 2) == "CANCELLED"
+
+
+def test_unique_order_number_needs_no_vendor(client):
+    create(client, "ONLY", 1)
+    assert client.post("/orders/ONLY/cancel").json()["status"] == "CANCELLED"
+    assert client.post("/orders/ONLY/cancel").status_code == 409
+    assert client.post("/orders/MISSING/cancel").status_code == 404
+
+
+def test_queued_processor_drops_a_cancelled_order(client, steps):
+    order_pk = create(client, "QUEUED", 1)
+    assert client.post("/orders/QUEUED/cancel?vendor_id=1").status_code == 200
+    assert len(cancellations) == 0
+
+    run_processor(order_pk, 1)
+    assert steps == []
+    assert status(client, "QUEUED", 1) == "CANCELLED"
+    assert len(cancellations) == 0
+
+
+def test_running_processor_stops_at_next_step(client, steps, monkeypatch):
+    order_pk = create(client, "RUNNING", 1)
+    real_sleep = asyncio.sleep
+
+    async def cancel_during_first_step(seconds):
+        if not seconds:
+            return await real_sleep(0)
+        steps.append(seconds)
+        if len(steps) == 1:
+            await asyncio.to_thread(client.post, "/orders/RUNNING/cancel?vendor_id=1")
+        await real_sleep(0)
+
+    monkeypatch.setattr(order_processing.asyncio, "sleep", cancel_during_first_step)
+    run_processor(order_pk, 1)
+
+    assert len(steps) == 1
+    assert status(client, "RUNNING", 1) == "CANCELLED"
+    assert len(cancellations) == 0
+
+
+def test_cancel_after_processor_finished_is_refused(client, steps, monkeypatch):
+    monkeypatch.setattr(status_writer, "interval", 60)
+    order_pk = create(client, "DONE", 1)
+
+    async def run():
+        await order_processing.process_order_background(order_pk, 1)
+        # PROCESSED is recorded but not flushed yet; the work is done all the same
+        response = await asyncio.to_thread(client.post, "/orders/DONE/cancel?vendor_id=1")
+        assert response.status_code == 409
+        assert "PROCESSED" in response.json()["detail"]
+        await status_writer.stop()
+
+    asyncio.run(run())
+    assert status(client, "DONE", 1) == "PROCESSED"
+    assert len(cancellations) == 0
+    assert status_writer.pending_status(order_pk, 1) is None
@@ -0,0 +1,151 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app import config
+from app.db.group_commit import GroupCommitWriter
+from app.db.models import Vendor
+from tests.conftest import order_payload
+
+
+def add_vendor(name):
+    def build(db):
+        vendor = Vendor(name=name, email=f"{name}@test.com")
+        db.add(vendor)
+        return lambda: vendor.id
+    return build
+
+
+def test_concurrent_jobs_share_batches(db_factory):
+    writer = GroupCommitWriter(db_factory, max_batch=64, linger_ms=50)
+    try:
+        with ThreadPoolExecutor(20) as pool:
+            ids = list(pool.map(writer.submit, [add_vendor(f"vendor{n}") for n in range(20)]))
+    finally:
+        writer.stop()
+
+    assert sorted(ids) == list(range(1, 21))
+    assert writer.jobs == 20
+    assert writer.batches < 20
+
+
+def test_concurrent_duplicates_get_one_200_and_409s(monkeypatch, db_factory, make_client):
+    from app.api import orders as orders_api
+
+    writer = GroupCommitWriter(db_factory, max_batch=64, linger_ms=50)
+    monkeypatch.setattr(orders_api, "order_writer", writer)
+    monkeypatch.setattr(config, "ORDER_GROUP_COMMIT_ENABLED", True)
+    client = make_client(db_factory)
+    vendor = client.post("/vendors/", json={"name": "Grouped", "email": "grouped@test.com"}).json()
+
+    def post(order_id):
+        return client.post("/orders/", json=order_payload(order_id, vendor["id"])).status_code
+
+    try:
+        with ThreadPoolExecutor(10) as pool:
+            codes = list(pool.map(post, ["SAME"] * 8 + ["OTHER_1", "OTHER_2"]))
+    finally:
+        writer.stop()
+
+    assert sorted(codes) == [200, 200, 200] + [409] * 7
+    assert len(client.get(f"/orders/{vendor['id']}").json()) == 3
+
+
+def test_writer_survives_a_failing_session_factory(db_factory):
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("no connection")
+        return db_factory()
+
+    writer = GroupCommitWriter(flaky_factory, linger_ms=0)
+    try:
+        with pytest.raises(RuntimeError, match="no connection"):
+            writer.submit(add_vendor("first"))
+        assert writer.submit(add_vendor("second")) == 1
+    finally:
+        writer.stop()
+
+
+def test_timed_out_job_is_never_committed(db_factory):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(db):
+        started.set()
+        release.wait()
+        return add_vendor("slow")(db)
+
+    writer = GroupCommitWriter(db_factory, max_batch=1, linger_ms=0, timeout=0.05)
+    with ThreadPoolExecutor(1) as pool:
+        running = pool.submit(writer.submit, slow)
+        started.wait()
+        try:
+            # Queued behind the slow batch, so it is withdrawn when the wait runs out
+            with pytest.raises(TimeoutError):
+                writer.submit(add_vendor("queued"))
+        finally:
+            release.set()
+        # The slow job was already being written, so its caller waits for it
+        assert running.result(timeout=5) == 1
+    writer.stop()
+
+    db = db_factory()
+    assert [v.name for v in db.query(Vendor).all()] == ["slow"]
+    db.close()
+    assert writer.jobs == 1
+
+
+def test_timeout_returns_503_and_records_write_latency(monkeypatch, db_factory, make_client):
+    from app.api import orders as orders_api
+    from app.utils import admission as admission_module
+
+    class TimingOut:
+        def submit(self, job):
+            raise TimeoutError("Group commit did not start within 0s")
+
+    latencies = []
+    monkeypatch.setattr(orders_api, "order_writer", TimingOut())
+    monkeypatch.setattr(config, "ORDER_GROUP_COMMIT_ENABLED", True)
+    monkeypatch.setattr(admission_module.admission, "record_write_latency", latencies.append)
+    client = make_client(db_factory)
+    vendor = client.post("/vendors/", json={"name": "Slow", "email": "slow@test.com"}).json()
+
+    response = client.post("/orders/", json=order_payload("LATE", vendor["id"]))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert len(latencies) == 1
+
+
+def test_jobs_queued_behind_stop_are_failed(db_factory):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(db):
+        started.set()
+        release.wait()
+        return add_vendor("blocking")(db)
+
+    writer = GroupCommitWriter(db_factory, linger_ms=0)
+    first = threading.Thread(target=writer.submit, args=(blocking,))
+    first.start()
+    started.wait()
+
+    stopper = threading.Thread(target=writer.stop)
+    stopper.start()
+    while writer._queue.empty():
+        pass
+    # A request that passed start() just before stop() ran
+    late: Future = Future()
+    writer._queue.put((add_vendor("late"), late))
+
+    release.set()
+    stopper.join()
+    first.join()
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        late.result(timeout=1)
+    db = db_factory()
+    assert [v.name for v in db.query(Vendor).all()] == ["blocking"]
+    db.close()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+
+from app import config
+from app.background import order_processing
+from app.db.models import Order, Vendor
+from app.db.models.order import OrderStatus
+from app.db.models.order_snapshot import OrderSnapshot
+from app.tools import import_orders
+from tests.conftest import order_payload
+
+
+@pytest.fixture
+def db(monkeypatch, db_factory):
+    engine = db_factory.kw["bind"]
+
+    def sessions():
+        session = db_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(import_orders, "init_db", lambda: None)
+    monkeypatch.setattr(import_orders, "shard_sessions", sessions)
+    monkeypatch.setattr(import_orders, "engine_for_vendor", lambda vendor_id: engine)
+
+    session = db_factory()
+    session.add(Vendor(id=1, name="Import Vendor", email="import@test.com"))
+    session.add(Order(order_id="EXISTING", vendor_id=1, address="1 Street", city="City",
+                      state="State", postal_code="12345"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def write_file(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def run(path, *args):
+    assert import_orders.main([path, "--workers", "0", *args]) == 0
+    with open(f"{path}.rejects.ndjson") as f:
+        return [json.loads(line) for line in f]
+
+
+def sample_file(tmp_path):
+    return write_file(tmp_path / "orders.ndjson", [
+        json.dumps(order_payload("NEW_1", 1, "HIGH")),
+        "{not json",
+        json.dumps({**order_payload("BAD_QTY", 1), "items": [{"item_name": "x", "quantity": 0}]}),
+        json.dumps(order_payload("EXISTING", 1)),
+        "",
+        json.dumps(order_payload("NO_VENDOR", 99)),
+        json.dumps(order_payload("NEW_2", 1)),
+        json.dumps(order_payload("NEW_2", 1)),
+    ])
+
+
+def test_import_skips_duplicates_and_rejects_invalid_lines(db, tmp_path):
+    rejects = run(sample_file(tmp_path), "--chunk-size", "3")
+
+    assert [(r["line"], r["reason"].split(":")[0]) for r in rejects] == [
+        (2, "invalid JSON"),
+        (3, "items.0.quantity"),
+        (6, "Vendor not found"),
+    ]
+    db.expire_all()
+    orders = {o.order_id: o for o in db.query(Order).all()}
+    assert sorted(orders) == ["EXISTING", "NEW_1", "NEW_2"]
+    assert orders["NEW_1"].status == OrderStatus.PROCESSED
+    assert [(item.item_name, item.quantity) for item in orders["NEW_1"].items] == [("Item for NEW_1", 2)]
+
+
+def test_import_can_reject_duplicates(db, tmp_path):
+    rejects = run(sample_file(tmp_path), "--duplicates", "reject")
+
+    duplicates = [r["line"] for r in rejects if r["reason"] == "Duplicate order for this vendor"]
+    assert duplicates == [4, 8]
+
+
+def test_import_writes_snapshots_with_read_model(db, tmp_path, monkeypatch):
+    from app.db.order_snapshots import serialize_order
+
+    monkeypatch.setattr(config, "ORDER_READ_MODEL_ENABLED", True)
+    run(sample_file(tmp_path))
+
+    db.expire_all()
+    imported = db.query(Order).filter(Order.order_id.in_(["NEW_1", "NEW_2"])).all()
+    snapshots = {s.id: s for s in db.query(OrderSnapshot).all()}
+    assert sorted(snapshots) == sorted(order.id for order in imported)
+    for order in imported:
+        assert snapshots[order.id].vendor_id == 1
+        assert snapshots[order.id].payload == serialize_order(order)
+
+
+def test_enqueue_processes_alongside_ingest_with_bounded_queue(db, db_factory, tmp_path, monkeypatch):
+    lines = [json.dumps(order_payload(f"Q{n}", 1)) for n in range(10)]
+    path = write_file(tmp_path / "queued.ndjson", lines)
+    chunk_size, concurrency = 2, 1
+    inserted_at_start = []
+
+    async def record_backlog(order_id, vendor_id=None):
+        session = db_factory()
+        try:
+            inserted_at_start.append(session.query(Order).filter(Order.order_id.like("Q%")).count())
+        finally:
+            session.close()
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(order_processing, "process_order_background", record_backlog)
+    run(path, "--processing", "enqueue", "--chunk-size", str(chunk_size), "--concurrency", str(concurrency))
+
+    assert len(inserted_at_start) == len(lines)
+    # Processing starts before ingest ends, and ingest never runs further ahead of
+    # the workers than the queue, the orders being processed and one chunk
+    assert inserted_at_start[0] < len(lines)
+    for started, inserted in enumerate(inserted_at_start):
+        assert inserted - started <= 2 * concurrency + chunk_size
+    db.expire_all()
+    assert {o.status for o in db.query(Order).filter(Order.order_id.like("Q%"))} == {OrderStatus.PENDING}
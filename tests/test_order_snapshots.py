@@ -0,0 +1,86 @@
+import pytest
+
+from app.db import order_snapshots as snapshots_module
+from app.db.models import Order, OrderItem, Vendor
+from app.db.models.order_snapshot import OrderSnapshot
+from app.db.order_snapshots import build_snapshot, check_snapshots, rebuild_snapshots
+from app.tools import order_snapshots as snapshots_tool
+
+CLEAN = {"missing": [], "stale": [], "orphaned": []}
+
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    session.add(Vendor(id=1, name="Snapshot Vendor", email="snapshot@test.com"))
+    for n in range(5):
+        order = Order(order_id=f"SNAP_{n}", vendor_id=1, address="1 Street", city="City",
+                      state="State", postal_code="12345")
+        order.items = [OrderItem(item_name=f"Item {k}", quantity=k + 1) for k in range(2)]
+        session.add(order)
+        session.flush()
+        session.add(build_snapshot(order))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def broken(db):
+    """Delete one snapshot, corrupt a second and orphan a third."""
+    ids = [order.id for order in db.query(Order).order_by(Order.id)]
+    db.query(OrderSnapshot).filter(OrderSnapshot.id == ids[0]).delete()
+    db.query(OrderSnapshot).filter(OrderSnapshot.id == ids[1]).update({"payload": "{}"})
+    db.query(OrderItem).filter(OrderItem.order_id == ids[2]).delete()
+    db.query(Order).filter(Order.id == ids[2]).delete()
+    db.commit()
+    return ids
+
+
+@pytest.fixture
+def tool(monkeypatch, db_factory):
+    def sessions():
+        session = db_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(snapshots_tool, "init_db", lambda: None)
+    monkeypatch.setattr(snapshots_tool, "shard_sessions", sessions)
+    return snapshots_tool.main
+
+
+def test_check_reports_missing_stale_and_orphaned(db, broken):
+    assert check_snapshots(db, batch_size=2) == {
+        "missing": [broken[0]],
+        "stale": [broken[1]],
+        "orphaned": [broken[2]],
+    }
+
+
+def test_check_is_clean_for_consistent_snapshots(db):
+    assert check_snapshots(db, batch_size=2) == CLEAN
+
+
+def test_rebuild_only_inconsistent_rewrites_just_those_rows(db, broken, monkeypatch):
+    rebuilt = []
+
+    def recording_build_snapshot(order, vendor=None):
+        rebuilt.append(order.id)
+        return build_snapshot(order, vendor)
+
+    monkeypatch.setattr(snapshots_module, "build_snapshot", recording_build_snapshot)
+    report = check_snapshots(db)
+    assert rebuild_snapshots(db, batch_size=2, only_ids=report["missing"] + report["stale"]) == 2
+
+    assert sorted(rebuilt) == [broken[0], broken[1]]
+    assert check_snapshots(db) == CLEAN
+
+
+def test_tool_exit_code_follows_check(db, broken, tool):
+    assert tool(["check"]) == 1
+    assert tool(["rebuild", "--only-inconsistent", "--batch-size", "2"]) == 0
+    assert tool(["check"]) == 0
+    db.expire_all()
+    assert check_snapshots(db) == CLEAN
@@ -0,0 +1,258 @@
+"""
+Query-plan regression tests.
+
+Every endpoint is called against a seeded SQLite database while its SQL is
+captured, and each statement is run through EXPLAIN QUERY PLAN. Two checks:
+
+- rules: no full scan of a large table, and no temp B-tree sort on a large
+  table unless the scenario is listed in ALLOWED_TEMP_BTREES with a reason
+- golden files in tests/query_plans/: any plan change fails with a unified
+  diff of the SQL and plan. Regenerate after an intended change with
+
+      UPDATE_QUERY_PLANS=1 python -m pytest tests/test_query_plans.py
+"""
+import difflib
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+PLAN_DIR = Path(__file__).parent / "query_plans"
+UPDATE_PLANS = os.getenv("UPDATE_QUERY_PLANS") == "1"
+
+LARGE_TABLES = {"orders", "order_items", "order_snapshots"}
+
+# scenario -> reason a temp B-tree on a large table is acceptable there
+ALLOWED_TEMP_BTREES = {}
+
+BIG_VENDOR, SMALL_VENDOR = 1, 2
+
+
+def order_payload(order_id, vendor_id=SMALL_VENDOR, priority="LOW"):
+    return {
+        "order_id": order_id,
+        "vendor_id": vendor_id,
+        "priority": priority,
+        "items": [{"item_name": "Item A", "quantity": 2}, {"item_name": "Item B", "quantity": 1}],
+        "address": "123 Test Street",
+        "city": "Test City",
+        "state": "Test State",
+        "postal_code": "12345"
+    }
+
+
+@pytest.fixture(scope="module")
+def env():
+    # Uses the app's own engine; conftest keeps it in a scratch directory
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db.session import SessionLocal, engine
+    from app.db.models import Order, OrderItem, Vendor
+    from app.db.models.order import OrderPriority
+    from app.db.order_snapshots import build_snapshot
+    from app.api import orders as orders_api
+
+    db = SessionLocal()
+    for n in range(1, 6):
+        db.add(Vendor(id=n, name=f"Vendor {n}", email=f"vendor{n}@test.com"))
+    priorities = list(OrderPriority)
+    for vendor_id, count in ((BIG_VENDOR, 120), (SMALL_VENDOR, 10)):
+        for i in range(count):
+            order = Order(
+                order_id=f"SEED_{vendor_id}_{i:04d}",
+                vendor_id=vendor_id,
+                priority=priorities[i % 3],
+                address="1 Seed Street",
+                city="Seed City",
+                state="Seed State",
+                postal_code="12345"
+            )
+            order.items = [OrderItem(item_name=f"Item {k}", quantity=k + 1) for k in range(3)]
+            db.add(order)
+            db.flush()
+            db.add(build_snapshot(order))
+    db.commit()
+    db.close()
+
+    app.state.limiter.enabled = False
+    with TestClient(app) as client:
+        yield client, engine, orders_api
+    app.state.limiter.enabled = True
+
+
+@contextmanager
+def captured_sql(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(engine, statement, parameters):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def plan_report(engine, statements):
+    """SQL, times executed and plan for every distinct statement that reads a table."""
+    report = {}
+    for statement, parameters in statements:
+        sql = re.sub(r"\s+", " ", statement).strip()
+        if not sql.upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            continue
+        if sql in report:
+            report[sql][0] += 1
+        else:
+            report[sql] = [1, explain(engine, statement, parameters)]
+    return [(sql, count, plan) for sql, (count, plan) in report.items()]
+
+
+def rule_violations(scenario, report):
+    violations = []
+    for sql, _, plan in report:
+        tables = {t for t in LARGE_TABLES if re.search(rf"\b{t}\b", sql)}
+        for line in plan:
+            detail = line.strip()
+            scan = re.match(r"SCAN (\w+)", detail)
+            if scan and scan.group(1) in LARGE_TABLES:
+                violations.append(f"full scan of {scan.group(1)}: {detail}\n    in: {sql}")
+            if "TEMP B-TREE" in detail and tables and scenario not in ALLOWED_TEMP_BTREES:
+                violations.append(f"temp B-tree on {', '.join(sorted(tables))}: {detail}\n    in: {sql}")
+    return violations
+
+
+def render(report):
+    # The execution count keeps N+1 query patterns visible in the diff
+    return "".join(
+        f"-- [x{count}] {sql}\n" + "".join(f"{line}\n" for line in plan) + "\n"
+        for sql, count, plan in report
+    )
+
+
+def check_plans(scenario, engine, statements):
+    report = plan_report(engine, statements)
+    assert report, f"{scenario}: no statements captured"
+
+    actual = render(report)
+    golden = PLAN_DIR / f"{scenario}.plan"
+    diff = ""
+    if golden.exists() and not UPDATE_PLANS:
+        diff = "".join(difflib.unified_diff(
+            golden.read_text().splitlines(keepends=True),
+            actual.splitlines(keepends=True),
+            fromfile=f"{golden.name} (expected)",
+            tofile=f"{golden.name} (actual)",
+        ))
+
+    violations = rule_violations(scenario, report)
+    if violations:
+        pytest.fail(f"{scenario} plan regressions:\n" + "\n".join(violations) + "\n\n" + diff)
+
+    if UPDATE_PLANS or not golden.exists():
+        PLAN_DIR.mkdir(exist_ok=True)
+        golden.write_text(actual)
+    elif diff:
+        pytest.fail(f"{scenario} query plan changed; if intended, rerun with UPDATE_QUERY_PLANS=1\n{diff}")
+
+
+def call(env, method, url, **kwargs):
+    client, engine, _ = env
+    with captured_sql(engine) as statements:
+        response = client.request(method, url, **kwargs)
+    assert response.status_code < 500, response.text
+    return response, statements
+
+
+def test_create_vendor(env):
+    response, statements = call(env, "POST", "/vendors/", json={"name": "Plan Vendor", "email": "plan@test.com"})
+    assert response.status_code == 200
+    check_plans("create_vendor", env[1], statements)
+
+
+def test_get_vendors(env):
+    response, statements = call(env, "GET", "/vendors/")
+    assert response.status_code == 200
+    check_plans("get_vendors", env[1], statements)
+
+
+def test_get_vendor(env):
+    response, statements = call(env, "GET", f"/vendors/{SMALL_VENDOR}")
+    assert response.status_code == 200
+    check_plans("get_vendor", env[1], statements)
+
+
+def test_create_order(env, monkeypatch):
+    async def skip_processing(order_id, vendor_id=None):
+        pass
+
+    _, _, orders_api = env
+    monkeypatch.setattr(orders_api, "process_order_background", skip_processing)
+    monkeypatch.setattr(orders_api, "process_high_priority_order", skip_processing)
+
+    response, statements = call(env, "POST", "/orders/", json=order_payload("PLAN_CREATE"))
+    assert response.status_code == 200
+    check_plans("create_order", env[1], statements)
+
+
+def test_get_orders(env):
+    response, statements = call(env, "GET", f"/orders/{SMALL_VENDOR}")
+    assert response.status_code == 200
+    check_plans("get_orders", env[1], statements)
+
+
+def test_get_orders_paginated(env):
+    response, statements = call(env, "GET", f"/orders/{BIG_VENDOR}?page=2&size=20")
+    assert response.status_code == 200
+    check_plans("get_orders_paginated", env[1], statements)
+
+
+def test_get_orders_filtered(env):
+    response, statements = call(
+        env, "GET", f"/orders/{BIG_VENDOR}?start_date=2000-01-01&end_date=2100-01-01&priority=HIGH"
+    )
+    assert response.status_code == 200
+    check_plans("get_orders_filtered", env[1], statements)
+
+
+def test_get_orders_read_model(env, monkeypatch):
+    from app import config
+    monkeypatch.setattr(config, "ORDER_READ_MODEL_ENABLED", True)
+
+    response, statements = call(env, "GET", f"/orders/{BIG_VENDOR}?page=1&size=50")
+    assert response.status_code == 200
+    check_plans("get_orders_read_model", env[1], statements)
+
+
+def test_get_order_status(env):
+    response, statements = call(env, "GET", f"/orders/status/SEED_{SMALL_VENDOR}_0003")
+    assert response.status_code == 200
+    check_plans("get_order_status", env[1], statements)
+
+
+def test_cancel_order(env):
+    response, statements = call(env, "POST", f"/orders/SEED_{SMALL_VENDOR}_0004/cancel?vendor_id={SMALL_VENDOR}")
+    assert response.status_code == 200
+    check_plans("cancel_order", env[1], statements)
+
+
+def test_get_order_summary(env):
+    response, statements = call(env, "GET", f"/orders/summary/{BIG_VENDOR}")
+    assert response.status_code == 200
+    check_plans("get_order_summary", env[1], statements)
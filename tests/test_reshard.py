@@ -0,0 +1,132 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Order, OrderItem, Vendor
+from app.db.models.order_snapshot import OrderSnapshot
+from app.db.order_snapshots import build_snapshot, check_snapshots
+from app.db.session import Base
+from app.db.shards import vendor_directory
+from app.tools import reshard
+from tests.conftest import sqlite_engine
+
+VENDOR_IDS = [1, 2, 3, 4, 5]
+
+
+def orders_for(vendor_id):
+    return vendor_id + 1
+
+
+@pytest.fixture
+def layout(tmp_path, monkeypatch):
+    """A single app.db with five vendors, their orders, items and snapshots."""
+    source = tmp_path / "app.db"
+    monkeypatch.setattr(reshard, "SQLALCHEMY_DATABASE_URL", f"sqlite:///{source}")
+    engine = sqlite_engine(source)
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as db:
+        for vendor_id in VENDOR_IDS:
+            db.add(Vendor(id=vendor_id, name=f"Vendor {vendor_id}", email=f"v{vendor_id}@test.com"))
+        # Interleave vendors so order ids in the source are not grouped by vendor
+        for n in range(max(map(orders_for, VENDOR_IDS))):
+            for vendor_id in VENDOR_IDS:
+                if n >= orders_for(vendor_id):
+                    continue
+                order = Order(order_id=f"V{vendor_id}_{n}", vendor_id=vendor_id, address="1 Street",
+                              city="City", state="State", postal_code="12345")
+                order.items = [OrderItem(item_name=f"V{vendor_id}_{n} item {k}", quantity=k + 1) for k in range(2)]
+                db.add(order)
+                db.flush()
+                db.add(build_snapshot(order))
+        db.commit()
+    engine.dispose()
+
+    def template(name):
+        return f"sqlite:///{tmp_path}/{name}_{{shard}}.db"
+
+    directory = f"sqlite:///{tmp_path}/directory.db"
+    return template, directory
+
+
+def run(*args):
+    return reshard.main([*args, "--batch-size", "2"])
+
+
+def shard_contents(template, count):
+    """Per shard: vendor ids, and order_id -> item names read through the item's order_id."""
+    contents = []
+    for n in range(count):
+        engine = sqlite_engine(template.format(shard=n).removeprefix("sqlite:///"))
+        with Session(bind=engine) as db:
+            vendor_ids = sorted(db.scalars(select(Vendor.id)))
+            orders = {}
+            for order_id, item_name in db.execute(
+                select(Order.order_id, OrderItem.item_name).join(OrderItem, OrderItem.order_id == Order.id)
+            ):
+                orders.setdefault(order_id, []).append(item_name)
+            order_ids = sorted(db.scalars(select(Order.id)))
+            snapshots = db.query(OrderSnapshot).count()
+            assert check_snapshots(db) == {"missing": [], "stale": [], "orphaned": []}
+        engine.dispose()
+        contents.append({"vendors": vendor_ids, "orders": orders, "order_ids": order_ids, "snapshots": snapshots})
+    return contents
+
+
+def directory_rows(directory):
+    engine = sqlite_engine(directory.removeprefix("sqlite:///"))
+    with engine.connect() as conn:
+        rows = conn.execute(select(vendor_directory).order_by(vendor_directory.c.id)).all()
+    engine.dispose()
+    return [tuple(row) for row in rows]
+
+
+def assert_layout(contents, count):
+    for shard, shard_data in enumerate(contents):
+        vendor_ids = [v for v in VENDOR_IDS if v % count == shard]
+        assert shard_data["vendors"] == vendor_ids
+        expected_orders = sum(orders_for(v) for v in vendor_ids)
+        # Orders get fresh, dense ids in their target shard
+        assert shard_data["order_ids"] == list(range(1, expected_orders + 1))
+        assert shard_data["snapshots"] == expected_orders
+        assert shard_data["orders"] == {
+            f"V{v}_{n}": [f"V{v}_{n} item 0", f"V{v}_{n} item 1"]
+            for v in vendor_ids for n in range(orders_for(v))
+        }
+
+
+def test_single_database_to_two_shards(layout):
+    template, directory = layout
+    assert run("--to-shards", "2", "--to-template", template("two"), "--directory-url", directory) == 0
+
+    assert_layout(shard_contents(template("two"), 2), 2)
+    assert directory_rows(directory) == [(v, f"Vendor {v}") for v in VENDOR_IDS]
+
+
+def test_two_shards_to_three(layout):
+    template, directory = layout
+    assert run("--to-shards", "2", "--to-template", template("two"), "--directory-url", directory) == 0
+    assert run("--from-shards", "2", "--from-template", template("two"),
+               "--to-shards", "3", "--to-template", template("three"), "--directory-url", directory) == 0
+
+    assert_layout(shard_contents(template("three"), 3), 3)
+    # The source layout is left as it was
+    assert_layout(shard_contents(template("two"), 2), 2)
+    assert directory_rows(directory) == [(v, f"Vendor {v}") for v in VENDOR_IDS]
+
+
+def test_refuses_target_that_overlaps_the_source(layout):
+    template, directory = layout
+    assert run("--to-shards", "2", "--to-template", template("two"), "--directory-url", directory) == 0
+
+    with pytest.raises(SystemExit) as exc:
+        run("--from-shards", "2", "--from-template", template("two"),
+            "--to-shards", "3", "--to-template", template("two"), "--directory-url", directory)
+    assert exc.value.code == 2
+
+
+def test_refuses_target_that_already_has_vendors(layout):
+    template, directory = layout
+    assert run("--to-shards", "2", "--to-template", template("two"), "--directory-url", directory) == 0
+
+    assert run("--to-shards", "2", "--to-template", template("two"), "--directory-url", directory) == 1
+    assert_layout(shard_contents(template("two"), 2), 2)
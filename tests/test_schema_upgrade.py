@@ -0,0 +1,46 @@
+import shutil
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.db.session import Base, upgrade_schema
+from app.db import models  # noqa: F401  (registers every table on Base)
+from app.db.models.order import Order, PRIORITY_RANK
+from tests.conftest import sqlite_engine
+
+SHIPPED_DB = Path(__file__).resolve().parent.parent / "app.db"
+
+
+def index_names(engine):
+    with engine.connect() as conn:
+        return set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+def plan(engine, sql, parameters=()):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters).all()]
+
+
+def test_shipped_database_gets_current_indexes(tmp_path):
+    # A copy: the shipped app.db itself must stay untouched
+    shutil.copy(SHIPPED_DB, tmp_path / "app.db")
+    engine = sqlite_engine(tmp_path / "app.db")
+
+    for _ in range(2):
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+
+    names = index_names(engine)
+    assert {"ix_order_items_order_id", "ix_vendor_priority_rank"} <= names
+    assert "ix_vendor_id" not in names
+
+    assert plan(engine, "SELECT * FROM order_items WHERE order_id = ?", (1,)) == [
+        "SEARCH order_items USING INDEX ix_order_items_order_id (order_id=?)"
+    ]
+    listing = select(Order).where(Order.vendor_id == 1).order_by(PRIORITY_RANK, Order.created_at)
+    compiled = listing.compile(engine)
+    assert plan(engine, str(compiled), tuple(compiled.params.values())) == [
+        "SEARCH orders USING INDEX ix_vendor_priority_rank (vendor_id=?)"
+    ]
+    engine.dispose()
+
@@ -0,0 +1,151 @@
+"""
+Two-shard tests. Vendor 1 lives in shard 1 and vendor 2 in shard 0, and each
+shard numbers its orders from 1, so every order id below exists in both shards.
+"""
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import sessionmaker
+
+from app import config
+from app.db.session import Base
+from app.db import models  # noqa: F401  (registers every table on Base)
+from app.db.models import Order, Vendor
+from app.db.shards import ShardRouter, create_shard_engines, directory_metadata, vendor_directory
+from tests.conftest import order_payload, sqlite_engine
+
+order_snapshots = Base.metadata.tables["order_snapshots"]
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch, make_client):
+    from app.api import vendors as vendors_api
+
+    router = ShardRouter(create_shard_engines([f"sqlite:///{tmp_path}/shard_{n}.db" for n in range(2)]))
+    directory = sqlite_engine(tmp_path / "primary.db")
+    directory_metadata.create_all(bind=directory)
+    for shard_engine in router.engines.values():
+        Base.metadata.create_all(bind=shard_engine)
+
+    monkeypatch.setattr(vendors_api, "shard_router", router)
+    monkeypatch.setattr(vendors_api, "engine", directory)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, class_=ShardedSession, **router.session_kwargs())
+    client = make_client(session_factory)
+    yield client, router, directory, session_factory
+
+    for shard_engine in router.engines.values():
+        shard_engine.dispose()
+    directory.dispose()
+
+
+def seed(client):
+    for vendor_id in (1, 2):
+        response = client.post("/vendors/", json={"name": f"Vendor {vendor_id}", "email": f"v{vendor_id}@test.com"})
+        assert response.json()["id"] == vendor_id
+        for order_id in (f"O{vendor_id}", "DUP"):
+            response = client.post("/orders/", json=order_payload(order_id, vendor_id))
+            assert response.status_code == 200, response.text
+
+
+def assert_own_orders(orders, vendor_id):
+    assert sorted(order["order_id"] for order in orders) == sorted([f"O{vendor_id}", "DUP"])
+    assert sorted(order["id"] for order in orders) == [1, 2]
+    for order in orders:
+        assert order["vendor"]["id"] == vendor_id
+        assert [item["item_name"] for item in order["items"]] == [f"Item for {order['order_id']}"]
+
+
+def test_get_orders_loads_items_from_the_vendors_shard(shards):
+    client = shards[0]
+    seed(client)
+
+    for vendor_id in (1, 2):
+        response = client.get(f"/orders/{vendor_id}")
+        assert response.status_code == 200
+        assert_own_orders(response.json(), vendor_id)
+
+
+def test_read_model_fallback_stays_on_the_vendors_shard(shards, monkeypatch):
+    client, router = shards[0], shards[1]
+    monkeypatch.setattr(config, "ORDER_READ_MODEL_ENABLED", True)
+    seed(client)
+
+    for vendor_id in (1, 2):
+        assert_own_orders(client.get(f"/orders/{vendor_id}").json(), vendor_id)
+
+    for shard_engine in router.engines.values():
+        with shard_engine.begin() as conn:
+            conn.execute(delete(order_snapshots))
+
+    for vendor_id in (1, 2):
+        response = client.get(f"/orders/{vendor_id}")
+        assert response.status_code == 200
+        assert_own_orders(response.json(), vendor_id)
+
+
+def test_get_vendors_gathers_every_shard(shards):
+    client = shards[0]
+    seed(client)
+
+    vendors = client.get("/vendors/").json()
+    assert [vendor["id"] for vendor in vendors] == [1, 2]
+    assert client.get("/vendors/2").json()["name"] == "Vendor 2"
+
+
+def test_status_lookup_with_colliding_ids(shards):
+    client = shards[0]
+    seed(client)
+
+    for vendor_id in (1, 2):
+        response = client.get(f"/orders/status/O{vendor_id}")
+        assert response.status_code == 200
+        assert response.json()["order_id"] == f"O{vendor_id}"
+        assert response.json()["status"] == "PENDING"
+
+
+def test_cancel_only_touches_the_given_vendor(shards):
+    client = shards[0]
+    seed(client)
+
+    response = client.post("/orders/DUP/cancel?vendor_id=2")
+    assert response.status_code == 200
+    assert response.json()["status"] == "CANCELLED"
+
+    statuses = {vendor_id: {o["order_id"]: o["status"] for o in client.get(f"/orders/{vendor_id}").json()}
+                for vendor_id in (1, 2)}
+    assert statuses == {
+        1: {"O1": "PENDING", "DUP": "PENDING"},
+        2: {"O2": "PENDING", "DUP": "CANCELLED"},
+    }
+
+
+def test_order_lookup_by_bare_id_is_refused(shards):
+    session_factory = shards[3]
+    seed(shards[0])
+
+    db = session_factory()
+    try:
+        with pytest.raises(ValueError, match="only unique within a shard"):
+            db.get(Order, 1)
+        assert db.get(Order, 1, identity_token="1").order_id == "O1"
+    finally:
+        db.close()
+
+
+def test_failed_vendor_insert_releases_its_directory_entry(shards):
+    client, router, directory = shards[0], shards[1], shards[2]
+
+    # Vendor id 1 is taken in its shard by a row the directory does not know about
+    with router.engines["1"].begin() as conn:
+        conn.execute(Vendor.__table__.insert().values(id=1, name="Stray", email="stray@test.com"))
+
+    with pytest.raises(IntegrityError):
+        client.post("/vendors/", json={"name": "Vendor 1", "email": "v1@test.com"})
+    with directory.connect() as conn:
+        assert conn.execute(select(vendor_directory)).all() == []
+
+    with router.engines["1"].begin() as conn:
+        conn.execute(delete(Vendor.__table__))
+    response = client.post("/vendors/", json={"name": "Vendor 1", "email": "v1@test.com"})
+    assert response.status_code == 200
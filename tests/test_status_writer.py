@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.background import status_writer as status_writer_module
+from app.background.status_writer import StatusWriter
+from app.db.models import Order, Vendor
+from app.db.models.order import OrderStatus
+
+VENDOR_ID = 1
+
+
+@pytest.fixture
+def db(monkeypatch, db_factory):
+    monkeypatch.setattr(status_writer_module, "SessionLocal", db_factory)
+    session = db_factory()
+    session.add(Vendor(id=VENDOR_ID, name="Status Vendor", email="status@test.com"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_orders(db, *statuses):
+    orders = [
+        Order(order_id=f"S{n}", vendor_id=VENDOR_ID, status=status,
+              address="1 Street", city="City", state="State", postal_code="12345")
+        for n, status in enumerate(statuses)
+    ]
+    db.add_all(orders)
+    db.commit()
+    return [order.id for order in orders]
+
+
+def statuses(db, ids):
+    db.expire_all()
+    return [db.get(Order, order_id).status for order_id in ids]
+
+
+def updates_during(db, coro):
+    """Run coro and return the UPDATE statements it sent to the database."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            captured.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        asyncio.run(coro)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def idle_writer():
+    # Never flushes on its own, so each test decides when the batch is written
+    return StatusWriter(interval_ms=60_000, max_pending=10_000)
+
+
+def test_transitions_are_coalesced_and_flushed_on_shutdown(db):
+    ids = add_orders(db, *[OrderStatus.PENDING] * 5)
+    writer = idle_writer()
+
+    async def run():
+        for order_id in ids:
+            writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSING)
+        for order_id in ids:
+            writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSED)
+        assert statuses(db, ids) == [OrderStatus.PENDING] * 5
+        await writer.stop()
+
+    updates = updates_during(db, run())
+    assert statuses(db, ids) == [OrderStatus.PROCESSED] * 5
+    assert len(updates) == 1
+    assert writer.transitions == 5
+    assert writer.flushes == 1
+
+
+def test_one_update_per_target_status(db):
+    ids = add_orders(db, *[OrderStatus.PENDING] * 4)
+    writer = idle_writer()
+
+    async def run():
+        writer.record(ids[0], VENDOR_ID, OrderStatus.PROCESSING)
+        writer.record(ids[1], VENDOR_ID, OrderStatus.PROCESSING)
+        writer.record(ids[2], VENDOR_ID, OrderStatus.PROCESSED)
+        writer.record(ids[3], VENDOR_ID, OrderStatus.FAILED)
+        await writer.stop()
+
+    updates = updates_during(db, run())
+    assert len(updates) == 3
+    assert statuses(db, ids) == [
+        OrderStatus.PROCESSING, OrderStatus.PROCESSING, OrderStatus.PROCESSED, OrderStatus.FAILED
+    ]
+
+
+def test_transitions_reach_the_database_in_order(db):
+    [order_id] = add_orders(db, OrderStatus.PENDING)
+    writer = idle_writer()
+    seen = []
+
+    async def run():
+        for status in (OrderStatus.PROCESSING, OrderStatus.PROCESSED):
+            writer.record(order_id, VENDOR_ID, status)
+            await writer.flush()
+            seen.extend(statuses(db, [order_id]))
+        await writer.stop()
+
+    asyncio.run(run())
+    assert seen == [OrderStatus.PROCESSING, OrderStatus.PROCESSED]
+
+
+@pytest.mark.parametrize("current", [OrderStatus.CANCELLED, OrderStatus.PROCESSED, OrderStatus.FAILED])
+def test_guard_never_overwrites_cancelled_or_terminal_states(db, current):
+    ids = add_orders(db, current, current, current)
+    writer = idle_writer()
+
+    async def run():
+        writer.record(ids[0], VENDOR_ID, OrderStatus.PROCESSING)
+        writer.record(ids[1], VENDOR_ID, OrderStatus.PROCESSED)
+        writer.record(ids[2], VENDOR_ID, OrderStatus.FAILED)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert statuses(db, ids) == [current] * 3
+
+
+def test_late_processing_does_not_move_an_order_backwards(db):
+    [order_id] = add_orders(db, OrderStatus.PENDING)
+    writer = idle_writer()
+
+    async def run():
+        writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSED)
+        await writer.flush()
+        writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSING)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert statuses(db, [order_id]) == [OrderStatus.PROCESSED]
+
+
+def test_max_pending_flushes_before_the_interval(db):
+    ids = add_orders(db, *[OrderStatus.PENDING] * 3)
+    writer = StatusWriter(interval_ms=60_000, max_pending=3)
+
+    async def run():
+        for order_id in ids:
+            writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSING)
+        for _ in range(100):
+            if writer.flushes:
+                break
+            await asyncio.sleep(0.01)
+        result = statuses(db, ids)
+        await writer.stop()
+        return result
+
+    assert asyncio.run(run()) == [OrderStatus.PROCESSING] * 3
+
+
+def test_pending_status_is_visible_until_committed(db, monkeypatch):
+    [order_id] = add_orders(db, OrderStatus.PENDING)
+    writer = idle_writer()
+    real_apply = writer._apply
+    during_write = []
+
+    def apply(batch):
+        during_write.append(writer.pending_status(order_id, VENDOR_ID))
+        real_apply(batch)
+
+    monkeypatch.setattr(writer, "_apply", apply)
+
+    async def run():
+        assert writer.pending_status(order_id, VENDOR_ID) is None
+        writer.record(order_id, VENDOR_ID, OrderStatus.PROCESSED)
+        assert writer.pending_status(order_id, VENDOR_ID) == OrderStatus.PROCESSED
+        await writer.stop()
+
+    asyncio.run(run())
+    assert during_write == [OrderStatus.PROCESSED]
+    assert writer.pending_status(order_id, VENDOR_ID) is None
+    assert statuses(db, [order_id]) == [OrderStatus.PROCESSED]